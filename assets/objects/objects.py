@@ -1,10 +1,16 @@
+import math
 import random
 import time
 import numpy as np
 import os
-from utils.graphics import Object, Shader
-from utils.matrix_utils import rotation_matrix, euler_to_matrix, matrix_to_euler
-from assets.shaders.shaders import standard_shader,laser_shader,minimap_shader,crosshair_shader
+from utils.graphics import Object, Shader, MeshRegistry, ShaderRegistry
+from utils.matrix_utils import (matrix_to_euler, euler_to_quaternion, quaternion_multiply, renormalize_quaternion,
+                                rotate_quaternion, quaternion_to_matrix, matrix_to_quaternion)
+from utils.entity_store import EntityStore, StoreField
+from utils.mesh_cache import load_cached_mesh, cache_is_current
+from utils.asset_loader import iter_load, BackgroundLoader
+from utils.mesh_utils import weld_vertices, decimate, parse_obj
+from assets.shaders.shaders import standard_shader,laser_shader,minimap_shader,crosshair_shader,standard_instanced_shader,laser_instanced_shader
 import os
 import numpy as np
 
@@ -56,24 +62,18 @@ def load_obj_file(file_path):
     return np.array(vertices), np.array(normals), np.array(texture_coords), faces
 
 def load_and_process_obj(model_path, scale=1.0):
-    vertices, normals, _, faces = load_obj_file(model_path)
+    positions, normals, _, corners = parse_obj(model_path)
     
-    vertices_with_normals = []
-    indices = []
-    index = 0
-    
-    for face in faces:
-        for vertex_data in face:
-            v_idx, _, n_idx = vertex_data
-            vertex = vertices[v_idx]
-            normal = normals[n_idx] if n_idx != -1 else [0, 0, 1]
-            vertices_with_normals.extend([*vertex, *normal])
-            indices.append(index)
-            index += 1
+    # One vertex per triangle corner; corners without a normal (index -1) get the appended +Z
+    normals = np.vstack([normals.reshape(-1, 3), np.array([0, 0, 1], dtype=np.float32)])
+    vertices_with_normals = np.empty((len(corners), 6), dtype=np.float32)
+    np.take(positions, corners[:, 0], axis=0, out=vertices_with_normals[:, :3])
+    np.take(normals, corners[:, 2], axis=0, out=vertices_with_normals[:, 3:])
+    indices = np.arange(len(corners), dtype=np.uint32)
     
     properties = {
-        'vertices': np.array(vertices_with_normals, dtype=np.float32),
-        'indices': np.array(indices, dtype=np.uint32),
+        'vertices': vertices_with_normals.reshape(-1),
+        'indices': indices,
         'position': np.zeros(3),
         'rotation': np.zeros(3),
         'scale': np.array([scale, scale, scale]),
@@ -82,14 +82,142 @@ def load_and_process_obj(model_path, scale=1.0):
     
     return properties
 
+# Bump when load_mesh_levels starts producing different arrays, to invalidate cached meshes
+MESH_FORMAT_VERSION = 4
+use_mesh_cache = True
+
+# Grid cells per axis of the simplified levels of detail, after the full mesh
+LOD_GRID_CELLS = (12, 6)
+# A level is only kept if it has at most this fraction of the previous level's triangles
+LOD_MIN_REDUCTION = 0.75
+
+def load_mesh_arrays(model_path):
+    """Parse an OBJ file into the interleaved vertex and index arrays a Mesh uploads."""
+    properties = load_and_process_obj(model_path)
+    # The parser emits a vertex per face corner; share the identical ones
+    return weld_vertices(properties['vertices'], properties['indices'])
+
+def load_mesh_levels(model_path):
+    """The full mesh followed by its vertex-clustered levels of detail, as (vertices, indices) pairs."""
+    levels = [load_mesh_arrays(model_path)]
+    for cells in LOD_GRID_CELLS:
+        vertices, indices = decimate(*levels[0], cells)
+        # Small models (e.g. the laser) gain nothing from clustering
+        if len(indices) <= LOD_MIN_REDUCTION * len(levels[-1][1]):
+            levels.append((vertices, indices))
+    return levels
+
+def load_mesh(model_path):
+    if use_mesh_cache:
+        return load_cached_mesh(model_path, load_mesh_levels, MESH_FORMAT_VERSION)
+    return load_mesh_levels(model_path)
+
+# Meshes are shared by every GameObject using the same (model path, scale)
+mesh_registry = MeshRegistry()
+
+# Arrays loaded ahead of time by preload_meshes, uploaded by the first acquire_mesh of each model
+preloaded_meshes = {}
+
+def preload_meshes(model_paths, max_workers=None, background=False):
+    """Load the arrays of every model that isn't on the GPU yet, ready for acquire_mesh.
+
+    Models whose binary cache is current are read directly; the rest are parsed
+    in parallel worker processes. Nothing touches GL, so the uploads still
+    happen on the calling thread as the objects are created. With
+    background=True this returns a BackgroundLoader at once, which fills
+    preloaded_meshes from a worker thread.
+    """
+    on_gpu = {path for path, _ in mesh_registry.meshes}
+    missing = [path for path in dict.fromkeys(model_paths) if path not in on_gpu and path not in preloaded_meshes]
+
+    def load():
+        stale = [path for path in missing if not (use_mesh_cache and cache_is_current(path, MESH_FORMAT_VERSION))]
+        for path in missing:
+            if path not in stale:
+                yield path, load_mesh(path)
+        yield from iter_load(load_mesh, stale, max_workers)
+
+    if background:
+        return BackgroundLoader(load(), len(missing), preloaded_meshes)
+    preloaded_meshes.update(load())
+
+def discard_preloaded_meshes():
+    preloaded_meshes.clear()
+
+def acquire_mesh(model_path, scale=1.0):
+    """Return the shared mesh for a model, loading its arrays only on first use."""
+    return mesh_registry.Acquire((model_path, scale), lambda: preloaded_meshes.pop(model_path, None) or load_mesh(model_path))
+
+def release_mesh(model_path, scale=1.0):
+    mesh_registry.Release((model_path, scale))
+
+# Identical shader sources compile to a single shared program
+shader_registry = ShaderRegistry()
+
+def acquire_shader(shader):
+    return shader_registry.Acquire(shader["vertex_shader"], shader["fragment_shader"])
+
+# Simulation state of every GameObject, stored as contiguous arrays for the batch kernels
+entity_store = EntityStore()
+
+def entity_ids(objects):
+    return np.fromiter((obj.entity_id for obj in objects), dtype=np.intp, count=len(objects))
+
+# Drag factors and thrust impulses were tuned per frame at this rate; they are
+# rescaled so the simulation behaves the same at any tick rate
+REFERENCE_TICK_RATE = 60.0
+
+def per_tick(factor, delta_time):
+    """Rescale a per-reference-tick decay factor to a step of delta_time."""
+    return factor ** (delta_time * REFERENCE_TICK_RATE)
+
 class GameObject:
-    def __init__(self, model_path, scale=1.0,shader=standard_shader):
-        
-        model_properties = load_and_process_obj(model_path, scale)
-        
-        
-        self.shader = Shader(shader["vertex_shader"], shader["fragment_shader"])
-        self.graphics_obj = Object("standard", self.shader, model_properties)
+    position = StoreField('position')
+    velocity = StoreField('velocity')
+    rotation = StoreField('rotation')
+    rotation_velocity = StoreField('rotation_velocity')
+    orientation = StoreField('orientation')
+    rotation_matrix = StoreField('orientation')
+    quaternion = StoreField('quaternion')
+    oriented = StoreField('oriented')
+    drag_factor = StoreField('drag')
+    collision_radius = StoreField('radius')
+
+    # Extra per-entity arrays a subclass needs in the store, as {name: shape}, or
+    # {name: add_field keyword arguments} for fields that aren't float32 zeros
+    STORE_FIELDS = {}
+
+    def __init__(self, model_path, scale=1.0,shader=standard_shader, instanced_shader=None, graphics=True):
+        
+        self.store = entity_store
+        for name, spec in self.STORE_FIELDS.items():
+            if isinstance(spec, dict):
+                self.store.add_field(name, **spec)
+            else:
+                self.store.add_field(name, spec)
+        self.entity_id = self.store.allocate()
+        self.model_path = model_path
+        self.model_scale = scale
+        self.colour = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+        
+        # Shaders acquired from the registry are released again in Delete()
+        self.acquired_shaders = []
+        self.shader = None
+        self.instanced_shader = None
+        self.graphics_obj = None
+        # Headless objects (graphics=False) only carry simulation state and never touch GL
+        if graphics:
+            mesh = acquire_mesh(model_path, scale)
+            model_properties = {
+                'position': np.zeros(3),
+                'rotation': np.zeros(3),
+                'scale': np.array([scale, scale, scale]),
+                'colour': self.colour
+            }
+            self.shader = self.use_shader(shader)
+            # Objects with an instanced shader can be batched by an InstancedRenderer
+            self.instanced_shader = self.use_shader(instanced_shader) if instanced_shader is not None else None
+            self.graphics_obj = Object("standard", self.shader, model_properties, mesh=mesh)
         
         
         self.position = np.zeros(3, dtype=np.float32)
@@ -102,109 +230,133 @@ class GameObject:
         self.acceleration = np.zeros(3, dtype=np.float32)
         self.drag_factor = 0.98  
         self.orientation = np.identity(3, dtype=np.float32)
+        # Orientation as a unit quaternion; while oriented is set the object is drawn
+        # from it, otherwise from the Euler rotation
+        self.quaternion = (1.0, 0.0, 0.0, 0.0)
+        self.oriented = False
 
     def update(self, delta_time):
-        self.update_position(delta_time)
-        self.update_rotation(delta_time)
-        self.apply_drag(self.drag_factor)
+        GameObject.update_all([self], delta_time)
+
+    @staticmethod
+    def update_all(objects, delta_time):
+        """Integrate position and apply drag for many objects in one pass over the store."""
+        if not objects:
+            return
+        store = objects[0].store
+        ids = entity_ids(objects)
+        store['position'][ids] += store['velocity'][ids] * delta_time
+
+        spinning = ids[np.any(store['rotation_velocity'][ids] != 0, axis=1)]
+        if len(spinning):
+            GameObject.spin(store, spinning, delta_time)
+
+        drag = per_tick(store['drag'][ids], delta_time)[:, np.newaxis]
+        store['velocity'][ids] *= drag
+        store['rotation_velocity'][ids] *= drag
     
-    def update_position(self, delta_time):
-        self.position += self.velocity * delta_time
-        self.graphics_obj.properties['position'] = self.position
+    @staticmethod
+    def spin(store, ids, delta_time):
+        """Turn the given entities by their rotation velocity in their local frame, in one batch.
+
+        Their quaternions are renormalized and converted to orientation matrices,
+        which the renderer uses directly (no Euler angles involved).
+        """
+        store['quaternion'][ids] = rotate_quaternion(store['quaternion'][ids], store['rotation_velocity'][ids] * delta_time)
+        store['orientation'][ids] = quaternion_to_matrix(store['quaternion'][ids])
+        store['oriented'][ids] = True
     
-    def update_rotation(self, delta_time):
-        if np.any(self.rotation_velocity):
-            # Create a combined delta rotation matrix directly
-            delta_rotation = rotation_matrix(
-                self.rotation_velocity[0] * delta_time,
-                self.rotation_velocity[1] * delta_time, 
-                self.rotation_velocity[2] * delta_time
-            )
-            
-            # Apply the rotation from the right (matches the sample code's approach)
-            self.orientation = self.orientation @ delta_rotation
-            
-            # Normalize the orientation matrix to prevent drift
-            u, _, vh = np.linalg.svd(self.orientation)
-            self.orientation = u @ vh
-            
-            # Update rotation_matrix for compatibility with our existing code
-            self.rotation_matrix = self.orientation
-            
-            # Update Euler angles for compatibility with renderer
-            self.rotation = matrix_to_euler(self.orientation)
-            
-        # Update the graphics object with the current Euler angles
-        self.graphics_obj.properties['rotation'] = self.rotation
-    
-    def matrix_to_euler(self, R):
-        """Convert a rotation matrix to Euler angles (ZYX convention)."""
-        # Handle singularity cases (gimbal lock)
-        if abs(R[2,0]) >= 1.0:
-            # Gimbal lock case
-            yaw = 0  # Set arbitrary
-            if R[2,0] < 0:
-                pitch = np.pi/2
-                roll = yaw + np.arctan2(R[0,1], R[0,2])
-            else:
-                pitch = -np.pi/2
-                roll = -yaw + np.arctan2(-R[0,1], -R[0,2])
+    def sync_graphics(self):
+        # Point the renderer at the current store rows (they move if the store grows)
+        if self.store.interpolated:
+            self.graphics_obj.properties['position'] = self.store['render_position'][self.entity_id]
         else:
-            # Standard case
-            pitch = np.arcsin(-R[2,0])
-            roll = np.arctan2(R[2,1]/np.cos(pitch), R[2,2]/np.cos(pitch))
-            yaw = np.arctan2(R[1,0]/np.cos(pitch), R[0,0]/np.cos(pitch))
-            
-        return np.array([roll, pitch, yaw], dtype=np.float32)
-    
-    def euler_to_matrix(self, euler):
-        """Convert Euler angles (roll, pitch, yaw) to rotation matrix."""
-        rx, ry, rz = euler
-        
-        Rx = np.array([
-            [1, 0, 0],
-            [0, np.cos(rx), -np.sin(rx)],
-            [0, np.sin(rx),  np.cos(rx)]
-        ])
-        
-        Ry = np.array([
-            [ np.cos(ry), 0, np.sin(ry)],
-            [0, 1, 0],
-            [-np.sin(ry), 0, np.cos(ry)]
-        ])
-        
-        Rz = np.array([
-            [np.cos(rz), -np.sin(rz), 0],
-            [np.sin(rz),  np.cos(rz), 0],
-            [0, 0, 1]
-        ])
-        
-        return Rz @ Ry @ Rx
-    
-    def apply_drag(self, drag_factor):
-        self.velocity *= drag_factor
-        self.rotation_velocity *= drag_factor
-    
+            self.graphics_obj.properties['position'] = self.position
+        self.graphics_obj.properties['rotation'] = self.rotation
+        self.graphics_obj.properties['orientation'] = self.orientation if self.oriented else None
+
+    def bounding_radius(self):
+        """Radius of a sphere around the object's position that contains its scaled mesh."""
+        return self.graphics_obj.mesh.boundingRadius * float(np.abs(self.graphics_obj.properties['scale']).max())
+
     def Draw(self):
+        if self.graphics_obj is None:
+            return
+        self.sync_graphics()
         self.graphics_obj.Draw()
+
+    def Delete(self):
+        """Drop this object's references to its shared mesh and shader."""
+        if self.entity_id is not None:
+            self.store.release(self.entity_id)
+            self.entity_id = None
+        if self.graphics_obj is not None:
+            self.graphics_obj.Delete()
+            self.graphics_obj = None
+            release_mesh(self.model_path, self.model_scale)
+            for shader in self.acquired_shaders:
+                shader_registry.Release(shader)
+            self.acquired_shaders = []
+
+    def use_shader(self, shader):
+        # Compiled Shaders are borrowed (e.g. from a LaserPool); source dicts come from the registry
+        if isinstance(shader, Shader):
+            return shader
+        shader = acquire_shader(shader)
+        self.acquired_shaders.append(shader)
+        return shader
+
+    def drop_shader(self, shader):
+        if shader in self.acquired_shaders:
+            self.acquired_shaders.remove(shader)
+            shader_registry.Release(shader)
+
+    def set_shader(self, shader, instanced_shader=None):
+        """Switch to other shader programs from the shared registry."""
+        if self.graphics_obj is None:
+            return
+        old_shaders = (self.shader, self.instanced_shader)
+        self.shader = self.use_shader(shader)
+        self.instanced_shader = self.use_shader(instanced_shader) if instanced_shader is not None else None
+        self.graphics_obj.shader = self.shader
+        for old_shader in old_shaders:
+            if old_shader is not None:
+                self.drop_shader(old_shader)
+
+    def submit(self, renderer):
+        """Queue this object on an InstancedRenderer, or draw it directly if it can't be instanced."""
+        if self.graphics_obj is None:
+            return
+        if self.instanced_shader is None or self.graphics_obj.mesh is None:
+            self.Draw()
+        else:
+            self.sync_graphics()
+            renderer.Submit(self.graphics_obj, self.instanced_shader)
     
     def set_position(self, position):
         self.position = np.array(position, dtype=np.float32)
-        self.graphics_obj.properties['position'] = self.position
+        # Placing an object is a teleport, so don't interpolate from where it was
+        self.store['tick_start'][self.entity_id] = self.position
     
     def set_rotation(self, rotation):
         """Set rotation using Euler angles (for backwards compatibility)."""
         self.rotation = np.array(rotation, dtype=np.float32)
-        self.orientation = euler_to_matrix(self.rotation)
-        self.rotation_matrix = self.orientation
-        self.graphics_obj.properties['rotation'] = self.rotation
+        self.quaternion = euler_to_quaternion(self.rotation)
+        self.orientation = quaternion_to_matrix(self.quaternion)
+        self.oriented = False
     
     def set_rotation_matrix(self, matrix):
         """Set rotation using a rotation matrix directly."""
         self.orientation = np.array(matrix, dtype=np.float32)
-        self.rotation_matrix = self.orientation
+        self.quaternion = matrix_to_quaternion(self.orientation)
         self.rotation = matrix_to_euler(self.orientation)
-        self.graphics_obj.properties['rotation'] = self.rotation
+        self.oriented = True
+
+    def set_orientation(self, quaternion):
+        """Set rotation using a unit quaternion (w, x, y, z); the Euler rotation is left as it was."""
+        self.quaternion = quaternion
+        self.orientation = quaternion_to_matrix(self.quaternion)
+        self.oriented = True
     
     def set_velocity(self, velocity):
         self.velocity = np.array(velocity, dtype=np.float32)
@@ -229,16 +381,18 @@ class GameObject:
         self.rotation_velocity += torque * magnitude
     
     def set_color(self, color):
-        self.graphics_obj.properties['colour'] = np.array(color, dtype=np.float32)
+        self.colour = np.array(color, dtype=np.float32)
+        if self.graphics_obj is not None:
+            self.graphics_obj.properties['colour'] = self.colour
 
 
 
 
 class Transporter(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'transporter.obj')
-        
-        super().__init__(model_path, scale=8.0)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'transporter.obj')
+
+    def __init__(self, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=8.0, graphics=graphics)
         
         
         self.set_color(np.array([0.804, 1, 1, 1], dtype=np.float32))
@@ -282,33 +436,33 @@ class Transporter(GameObject):
         self.up_direction = self.local_up.copy()
     
     def process_inputs(self, inputs, delta_time):
-        # Create incremental rotation matrix directly based on inputs
-        dR = np.eye(3, dtype=np.float32)
+        # Collect the incremental turns (Euler steps in the local frame) based on inputs
+        turns = []
         rotation_speed = self.turn_power * 50  # Adjust for reasonable rotation speed
         
         if inputs["Q"]:
-            dR = dR @ rotation_matrix(rotation_speed * delta_time, 0, 0)  # pitch down
+            turns.append((rotation_speed * delta_time, 0, 0))  # pitch down
         if inputs["E"]:
-            dR = dR @ rotation_matrix(-rotation_speed * delta_time, 0, 0)  # pitch up
+            turns.append((-rotation_speed * delta_time, 0, 0))  # pitch up
         if inputs["A"] :
-            dR = dR @ rotation_matrix(0, 0, -rotation_speed * delta_time)  # roll left
+            turns.append((0, 0, -rotation_speed * delta_time))  # roll left
         # elif inputs["A"] and self.local_up.dot(self.up_direction) < 0:
-        #     dR = dR @ rotation_matrix(0, 0, rotation_speed * delta_time)  # roll right
+        #     turns.append((0, 0, rotation_speed * delta_time))  # roll right
         if inputs["D"] :
-            dR = dR @ rotation_matrix(0, 0, rotation_speed * delta_time)  # roll right
+            turns.append((0, 0, rotation_speed * delta_time))  # roll right
         # elif inputs["D"] and self.local_up.dot(self.up_direction) < 0:
-        #     dR = dR @ rotation_matrix(0, 0, -rotation_speed * delta_time)  # roll left
+        #     turns.append((0, 0, -rotation_speed * delta_time))  # roll left
         if inputs["W"]:
-            dR = dR @ rotation_matrix(0, rotation_speed * delta_time, 0)  # yaw left
+            turns.append((0, rotation_speed * delta_time, 0))  # yaw left
         if inputs["S"]:
-            dR = dR @ rotation_matrix(0, -rotation_speed * delta_time, 0)  # yaw right
+            turns.append((0, -rotation_speed * delta_time, 0))  # yaw right
 
-        # Apply the incremental rotation to the current orientation
-        self.orientation = self.orientation @ dR
-        
-        # Normalize to prevent drift
-        u, _, vh = np.linalg.svd(self.orientation)
-        self.orientation = u @ vh
+        # Apply the turns to the current orientation in order, renormalizing against drift
+        if turns:
+            quaternion = self.quaternion
+            for turn in euler_to_quaternion(turns):
+                quaternion = quaternion_multiply(quaternion, turn)
+            self.set_orientation(renormalize_quaternion(quaternion))
         
         # Track if accelerating
         self.is_accelerating = inputs["SPACE"]
@@ -319,7 +473,7 @@ class Transporter(GameObject):
         
         # Apply thrust in the forward direction
         if inputs["SPACE"] and self.view==1:
-            self.add_force(self.forward_direction, self.thrust_power)
+            self.add_force(self.forward_direction, self.thrust_power * delta_time * REFERENCE_TICK_RATE)
     
     def update(self, inputs, delta_time):
         # Process inputs first
@@ -335,11 +489,6 @@ class Transporter(GameObject):
         self.right_direction /= np.linalg.norm(self.right_direction)
         self.up_direction /= np.linalg.norm(self.up_direction)
         
-        # Update rotation_matrix and Euler angles for compatibility
-        self.rotation_matrix = self.orientation
-        self.rotation = matrix_to_euler(self.orientation)
-        self.graphics_obj.properties['rotation'] = self.rotation
-        
         # Limit speed
         speed = np.linalg.norm(self.velocity)
         if speed > self.max_speed:
@@ -347,10 +496,9 @@ class Transporter(GameObject):
         
         # Update position with current velocity
         self.position += self.velocity * delta_time
-        self.graphics_obj.properties['position'] = self.position
         
         # Apply drag
-        self.velocity *= self.drag_factor
+        self.velocity *= per_tick(self.drag_factor, delta_time)
     
     def can_shoot(self, current_time):
         # if third person view, can not shoot
@@ -359,30 +507,27 @@ class Transporter(GameObject):
         
         return True
     
-    def shoot(self, current_time):
+    def shoot(self, current_time, laser_pool):
         if self.can_shoot(current_time):
             # print("Pew pew!")
             self.last_shot_time = current_time
             
 
-            laser = Laser()
+            laser = laser_pool.acquire()
             
             
             laser_offset = self.forward_direction * 5.0  
             laser_pos = self.position + laser_offset
             laser.set_position(laser_pos)
+            laser.previous_position = laser_pos
             
             
-            laser.set_rotation(self.rotation.copy())
+            laser.set_orientation(self.quaternion.copy())
             
             
             laser_speed = laser.speed+np.linalg.norm(self.velocity)
             laser.set_velocity(self.forward_direction * laser_speed)
             
-            
-            # laser.lifetime = 3.0
-            # laser.time_alive = 0.0
-            
             return laser
         
         return None
@@ -402,10 +547,34 @@ class Transporter(GameObject):
     def toggle_view(self):
         self.view = 3 - self.view  
 
+def random_directions(count):
+    """Generate random normalized directions in the horizontal plane, one per row."""
+    directions = np.zeros((count, 3), dtype=np.float32)
+    directions[:, 0] = np.random.uniform(-1.0, 1.0, count)
+    directions[:, 2] = np.random.uniform(-1.0, 1.0, count)
+    return directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
 class Pirate(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'pirate.obj')
-        super().__init__(model_path, scale=20.0)  
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'pirate.obj')
+    STORE_FIELDS = {
+        'target_direction': (3,),
+        'direction_timer': (),
+        'direction_change_interval': (),
+        'chase_speed': (),
+        'patrol_speed': (),
+        'chase_distance': (),
+        'turn_rate': (),
+    }
+    target_direction = StoreField('target_direction')
+    direction_timer = StoreField('direction_timer')
+    direction_change_interval = StoreField('direction_change_interval')
+    chase_speed = StoreField('chase_speed')
+    patrol_speed = StoreField('patrol_speed')
+    chase_distance = StoreField('chase_distance')
+    rotation_speed = StoreField('turn_rate')
+
+    def __init__(self, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=20.0, instanced_shader=standard_instanced_shader, graphics=graphics)  
         
         # Set colors and base properties
         self.set_color(np.array([0.2, 0.8, 0.7, 1.0], dtype=np.float32))
@@ -439,44 +608,56 @@ class Pirate(GameObject):
         return direction / np.linalg.norm(direction)
     
     def update(self, delta_time, player_position, player_forward=None):
+        Pirate.update_all([self], delta_time, player_position)
+
+    @staticmethod
+    def update_all(pirates, delta_time, player_position):
+        """Chase/patrol AI for every pirate at once, operating on the entity store arrays."""
+        if not pirates:
+            return
+        store = pirates[0].store
+        ids = entity_ids(pirates)
+        position = store['position'][ids]
+        target = store['target_direction'][ids]
+
         # Calculate vector to player
-        to_player = player_position - self.position
-        distance_to_player = np.linalg.norm(to_player)
-        
-        if distance_to_player < self.chase_distance:
-            # CHASE MODE - Direct pursuit
-            self.target_direction = to_player / distance_to_player
-            self.velocity = self.target_direction * self.chase_speed
-        else:
-            # PATROL MODE - Simple wandering
-            self.direction_timer += delta_time
-            if self.direction_timer >= self.direction_change_interval:
-                self.target_direction = self.generate_random_direction()
-                self.direction_timer = 0.0
-            
-            # World boundary check
-            world_boundary = 4800
-            for i in range(3):
-                if abs(self.position[i]) > world_boundary:
-                    self.target_direction[i] = -np.sign(self.position[i])
-            
-            self.velocity = self.target_direction * self.patrol_speed
-        
+        to_player = player_position - position
+        distance_to_player = np.linalg.norm(to_player, axis=1)
+        chase = distance_to_player < store['chase_distance'][ids]
+        patrol = ~chase
+
+        # CHASE MODE - Direct pursuit
+        target[chase] = to_player[chase] / np.maximum(distance_to_player[chase], 1e-6)[:, np.newaxis]
+
+        # PATROL MODE - Simple wandering
+        timer = store['direction_timer']
+        timer[ids[patrol]] += delta_time
+        change = patrol & (timer[ids] >= store['direction_change_interval'][ids])
+        target[change] = random_directions(int(change.sum()))
+        timer[ids[change]] = 0.0
+
+        # World boundary check
+        world_boundary = 4800
+        outside = patrol[:, np.newaxis] & (np.abs(position) > world_boundary)
+        target[outside] = -np.sign(position[outside])
+
+        speed = np.where(chase, store['chase_speed'][ids], store['patrol_speed'][ids])
+        velocity = target * speed[:, np.newaxis]
+        store['target_direction'][ids] = target
+        store['velocity'][ids] = velocity
+
         # Rotate to face movement direction
-        if np.linalg.norm(self.velocity) > 0.1:
-            target_yaw = np.arctan2(self.velocity[2], self.velocity[0])
-            current_yaw = self.rotation[1]
-            angle_diff = (target_yaw - current_yaw + np.pi) % (2 * np.pi) - np.pi
-            
-            # Smooth rotation
-            rotation_amount = min(self.rotation_speed * delta_time, abs(angle_diff))
-            if abs(angle_diff) > 0.01:
-                if angle_diff > 0:
-                    self.rotation[1] += rotation_amount
-                else:
-                    self.rotation[1] -= rotation_amount
-        
-        super().update(delta_time)
+        moving = np.linalg.norm(velocity, axis=1) > 0.1
+        target_yaw = np.arctan2(velocity[:, 2], velocity[:, 0])
+        current_yaw = store['rotation'][ids, 1]
+        angle_diff = (target_yaw - current_yaw + np.pi) % (2 * np.pi) - np.pi
+
+        # Smooth rotation
+        rotation_amount = np.minimum(store['turn_rate'][ids] * delta_time, np.abs(angle_diff))
+        turning = moving & (np.abs(angle_diff) > 0.01)
+        store['rotation'][ids[turning], 1] += np.sign(angle_diff[turning]) * rotation_amount[turning]
+
+        GameObject.update_all(pirates, delta_time)
     
     def take_damage(self, amount):
         self.health -= amount
@@ -484,9 +665,10 @@ class Pirate(GameObject):
 
 
 class Planet(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'planet.obj')
-        super().__init__(model_path, scale=100.0)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'planet.obj')
+
+    def __init__(self, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=100.0, instanced_shader=standard_instanced_shader, graphics=graphics)
         
         
         self.set_rotation(np.array([
@@ -497,11 +679,23 @@ class Planet(GameObject):
         
         
         self.set_color(np.array([0.8, 0.8, 0.8, 1.0], dtype=np.float32))
+        
+        self.collision_radius = 100.0
 
 class SpaceStation(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'spacestation.obj')
-        super().__init__(model_path, scale=8.0)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'spacestation.obj')
+    STORE_FIELDS = {
+        'orbit_angle': (),
+        'orbit_radius': (),
+        'orbit_speed': (),
+        'parent': {'shape': (), 'dtype': np.intp, 'default': -1},
+    }
+    orbit_angle = StoreField('orbit_angle')
+    orbit_radius = StoreField('orbit_radius')
+    orbit_speed = StoreField('orbit_speed')
+
+    def __init__(self, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=8.0, instanced_shader=standard_instanced_shader, graphics=graphics)
         
         
         self.set_color(np.array([0.7, 0.7, 0.9, 1.0], dtype=np.float32))
@@ -511,34 +705,48 @@ class SpaceStation(GameObject):
         self.orbit_angle = 0.0
         self.orbit_radius = 250.0
         self.orbit_speed = 0.3  
+
+    @property
+    def parent_planet(self):
+        return self._parent_planet
+
+    @parent_planet.setter
+    def parent_planet(self, planet):
+        # The kernel follows the parent through its entity id, -1 meaning no parent
+        self._parent_planet = planet
+        self.store['parent'][self.entity_id] = -1 if planet is None else planet.entity_id
     
     def update(self, delta_time):
-        
-        if self.parent_planet is not None:
-            
-            self.orbit_angle += self.orbit_speed * delta_time
-            
-            
-            planet_pos = self.parent_planet.position
-            self.position = planet_pos + np.array([
-                self.orbit_radius * np.cos(self.orbit_angle),
-                0,  
-                self.orbit_radius * np.sin(self.orbit_angle)
-            ], dtype=np.float32)
-            
-            
-            self.graphics_obj.properties['position'] = self.position
-            
-            
-            self.rotation += np.array([0, 0.1 * delta_time, 0], dtype=np.float32)
-            self.graphics_obj.properties['rotation'] = self.rotation
+        SpaceStation.update_all([self], delta_time)
+
+    @staticmethod
+    def update_all(stations, delta_time):
+        """Advance the orbit of every station around its parent planet in one pass."""
+        if not stations:
+            return
+        store = stations[0].store
+        ids = entity_ids(stations)
+        parents = store['parent'][ids]
+        orbiting = parents >= 0
+        ids, parents = ids[orbiting], parents[orbiting]
+
+        store['orbit_angle'][ids] += store['orbit_speed'][ids] * delta_time
+        angle = store['orbit_angle'][ids]
+        radius = store['orbit_radius'][ids]
+
+        offset = np.zeros((len(ids), 3), dtype=np.float32)
+        offset[:, 0] = radius * np.cos(angle)
+        offset[:, 2] = radius * np.sin(angle)
+        store['position'][ids] = store['position'][parents] + offset
+
+        store['rotation'][ids, 1] += 0.1 * delta_time
 
             
 class MinimapArrow(GameObject):
-    def __init__(self, target_object=None, color=None):
-        model_path = os.path.join('assets', 'objects', 'models', 'arrow.obj')
-        
-        super().__init__(model_path, scale=30.0)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'arrow.obj')
+
+    def __init__(self, target_object=None, color=None, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=30.0, graphics=graphics)
         
         
         self.target_object = target_object
@@ -588,12 +796,14 @@ class MinimapArrow(GameObject):
         self.set_rotation(np.array([pitch, yaw, 0.0], dtype=np.float32))
         
         
-        self.graphics_obj.properties['scale'] = np.array([30.0, 30.0, 30.0], dtype=np.float32)
+        if self.graphics_obj is not None:
+            self.graphics_obj.properties['scale'] = np.array([30.0, 30.0, 30.0], dtype=np.float32)
 
 class Crosshair(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'direction_arrow.obj')
-        super().__init__(model_path, scale=0.05, shader=crosshair_shader)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'direction_arrow.obj')
+
+    def __init__(self, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=0.05, shader=crosshair_shader, graphics=graphics)
         
         
         self.set_color(np.array([1.0, 0.2, 0.2, 1.0], dtype=np.float32))
@@ -617,28 +827,124 @@ class Crosshair(GameObject):
         self.set_rotation(np.array([pitch, yaw, 0.0], dtype=np.float32))
 
 class Laser(GameObject):
-    def __init__(self):
-        model_path = os.path.join('assets', 'objects', 'models', 'laser.obj')
-        super().__init__(model_path, scale=7, shader=laser_shader)
+    MODEL_PATH = os.path.join('assets', 'objects', 'models', 'laser.obj')
+    STORE_FIELDS = {
+        'time_alive': (),
+        'lifetime': (),
+        'previous_position': (3,),
+    }
+    time_alive = StoreField('time_alive')
+    lifetime = StoreField('lifetime')
+    # Where the laser was before its last update, for swept collision tests
+    previous_position = StoreField('previous_position')
+    # Seconds a shot flies before it expires
+    LIFETIME = 3.0
+
+    def __init__(self, shader=laser_shader, instanced_shader=laser_instanced_shader, graphics=True):
+        super().__init__(self.MODEL_PATH, scale=7, shader=shader, instanced_shader=instanced_shader, graphics=graphics)
         
         
         self.set_color(np.array([0.5, 0, 1, 1.0], dtype=np.float32))
         
         
-        self.lifetime = 3.0  
+        self.lifetime = self.LIFETIME
         self.time_alive = 0.0
         self.speed =10000
 
         
     def update(self, delta_time):
-        
-        super().update(delta_time)
-        
-        
-        self.time_alive += delta_time
-        
-        
-        return self.time_alive >= self.lifetime
+        return bool(Laser.update_all([self], delta_time)[0])
+
+    @staticmethod
+    def update_all(lasers, delta_time):
+        """Move every laser and age it; returns a boolean mask of the expired ones."""
+        if not lasers:
+            return np.zeros(0, dtype=bool)
+        store = lasers[0].store
+        ids = entity_ids(lasers)
+        store['previous_position'][ids] = store['position'][ids]
+        GameObject.update_all(lasers, delta_time)
+        store['time_alive'][ids] += delta_time
+        return store['time_alive'][ids] >= store['lifetime'][ids]
+
+    def reset(self):
+        """Clear the motion state so a pooled laser can be fired again."""
+        self.time_alive = 0.0
+        self.velocity[:] = 0.0
+        self.rotation_velocity[:] = 0.0
+
+
+class LaserPool:
+    """Preallocated lasers that are recycled instead of rebuilt per shot.
+
+    Expired lasers go back to the pool; a laser still in flight is never taken.
+    If every laser is flying, the pool doubles.
+    """
+    def __init__(self, capacity=64, graphics=True):
+        self.capacity = 0
+        self.graphics = graphics
+        self.shader = acquire_shader(laser_shader) if graphics else None
+        self.instanced_shader = acquire_shader(laser_instanced_shader) if graphics else None
+        self.lasers = []
+        self.free = []
+        self.active = []
+        self.high_water_mark = 0
+        self.grow(capacity)
+
+    @staticmethod
+    def capacity_for(tick_rate, shots_per_tick=1):
+        """Lasers alive at once when firing every tick: enough to never grow under sustained fire."""
+        # Plus one tick's shots, fired before that tick expires the oldest ones
+        return (math.ceil(Laser.LIFETIME * tick_rate) + 1) * shots_per_tick
+
+    @property
+    def active_count(self):
+        return len(self.active)
+
+    def grow(self, capacity):
+        added = [Laser(shader=self.shader, instanced_shader=self.instanced_shader, graphics=self.graphics)
+                 for _ in range(capacity - self.capacity)]
+        self.lasers.extend(added)
+        self.free.extend(added)
+        self.capacity = len(self.lasers)
+
+    def acquire(self):
+        if not self.free:
+            self.grow(max(1, self.capacity * 2))
+        laser = self.free.pop()
+        laser.reset()
+        self.active.append(laser)
+        self.high_water_mark = max(self.high_water_mark, len(self.active))
+        return laser
+
+    def release(self, laser):
+        self.active.remove(laser)
+        self.free.append(laser)
+
+    def release_many(self, lasers):
+        """Return several lasers at once, compacting the active list in a single pass."""
+        if not lasers:
+            return
+        released = set(map(id, lasers))
+        self.free.extend(lasers)
+        self.active[:] = [laser for laser in self.active if id(laser) not in released]
+
+    def update(self, delta_time):
+        """Advance active lasers and return the expired ones to the pool."""
+        expired = Laser.update_all(self.active, delta_time)
+        if expired.any():
+            self.free.extend(laser for laser, done in zip(self.active, expired) if done)
+            # Slice assignment keeps the list shared with Game.gameState["lasers"]
+            self.active[:] = [laser for laser, done in zip(self.active, expired) if not done]
+
+    def Delete(self):
+        for laser in self.lasers:
+            laser.Delete()
+        if self.shader is not None:
+            shader_registry.Release(self.shader)
+            shader_registry.Release(self.instanced_shader)
+        self.active.clear()
+        self.free.clear()
 
 
 
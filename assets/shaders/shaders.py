@@ -1,3 +1,6 @@
+# Every 3D program reads the camera from the "CameraBlock" uniform block, which
+# Camera uploads once per frame to the CAMERA_BLOCK_BINDING binding point.
+
 ######################################################
 # Minimap shader with orthographic projection and derivative-based normal calculation
 minimap_shader = {
@@ -6,8 +9,12 @@ minimap_shader = {
         layout(location = 0) in vec3 vertexPosition;
 
         uniform mat4 modelMatrix;
-        uniform mat4 viewMatrix;
         uniform mat4 orthoProjectionMatrix;
+        layout(std140, row_major) uniform CameraBlock {
+            mat4 viewMatrix;
+            mat4 projectionMatrix;
+            float focalLength;
+        };
         
         out vec3 fragmentPosition;
         out vec4 v_clip_pos;
@@ -126,9 +133,11 @@ crosshair_shader = {
         layout(location = 1) in vec3 vertexNormal;
 
         uniform mat4 modelMatrix;
-        uniform mat4 viewMatrix;
-        uniform mat4 projectionMatrix;
-        uniform float focalLength;
+        layout(std140, row_major) uniform CameraBlock {
+            mat4 viewMatrix;
+            mat4 projectionMatrix;
+            float focalLength;
+        };
         
         out vec3 fragmentPosition;
         out vec3 fragmentNormal;
@@ -182,9 +191,11 @@ standard_shader = {
         layout(location = 1) in vec3 vertexNormal;
 
         uniform mat4 modelMatrix;
-        uniform mat4 viewMatrix;
-        uniform mat4 projectionMatrix;
-        uniform float focalLength;
+        layout(std140, row_major) uniform CameraBlock {
+            mat4 viewMatrix;
+            mat4 projectionMatrix;
+            float focalLength;
+        };
         
         out vec3 fragmentPosition;
         out vec3 fragmentNormal;
@@ -269,9 +280,11 @@ laser_shader = {
         layout(location = 1) in vec3 vertexNormal;
 
         uniform mat4 modelMatrix;
-        uniform mat4 viewMatrix;
-        uniform mat4 projectionMatrix;
-        uniform float focalLength;
+        layout(std140, row_major) uniform CameraBlock {
+            mat4 viewMatrix;
+            mat4 projectionMatrix;
+            float focalLength;
+        };
         
         out vec3 fragmentPosition;
         out vec3 fragmentNormal;
@@ -369,4 +382,157 @@ laser_shader = {
 
 ######################################################
 # Enhanced glowing destination shader
-destination_shader = laser_shader.copy()
\ No newline at end of file
+destination_shader = laser_shader.copy()
+
+######################################################
+# Instanced variants: the model matrix (locations 2-5) and colour (location 6)
+# come from a per-instance buffer instead of uniforms, so one draw call covers
+# every object sharing a mesh. The fragment stages are reused with objectColour
+# turned into a varying.
+instanced_vertex_shader = '''
+        #version 330 core
+        layout(location = 0) in vec3 vertexPosition;
+        layout(location = 1) in vec3 vertexNormal;
+        layout(location = 2) in mat4 instanceModelMatrix;
+        layout(location = 6) in vec4 instanceColour;
+
+        layout(std140, row_major) uniform CameraBlock {
+            mat4 viewMatrix;
+            mat4 projectionMatrix;
+            float focalLength;
+        };
+        
+        out vec3 fragmentPosition;
+        out vec3 fragmentNormal;
+        out vec4 v_clip_pos;
+        out vec4 objectColour;
+
+        void main() {
+            vec4 worldPos = instanceModelMatrix * vec4(vertexPosition, 1.0);
+            fragmentPosition = worldPos.xyz;
+            fragmentNormal = mat3(transpose(inverse(instanceModelMatrix))) * vertexNormal;
+            objectColour = instanceColour;
+            
+            vec4 camCoordPos = viewMatrix * worldPos;
+            v_clip_pos = projectionMatrix * vec4(focalLength * (camCoordPos[0] / abs(camCoordPos[2])), 
+                                           focalLength * (camCoordPos[1] / abs(camCoordPos[2])), 
+                                           camCoordPos[2], 1.0);
+            gl_Position = v_clip_pos;
+        }
+    '''
+
+standard_instanced_shader = {
+    "vertex_shader" : instanced_vertex_shader,
+    "fragment_shader" : standard_shader["fragment_shader"].replace("uniform vec4 objectColour;", "in vec4 objectColour;")
+}
+
+laser_instanced_shader = {
+    "vertex_shader" : instanced_vertex_shader,
+    "fragment_shader" : laser_shader["fragment_shader"].replace("uniform vec4 objectColour;", "in vec4 objectColour;")
+}
+
+destination_instanced_shader = laser_instanced_shader.copy()
+
+######################################################
+# Screen-space overlay triangles (HUD effects), positioned in pixels with a colour per vertex
+overlay_shader = {
+    "vertex_shader" : '''
+        #version 330 core
+        layout(location = 0) in vec2 vertexPosition;
+        layout(location = 1) in vec4 vertexColour;
+
+        uniform vec2 screenSize;
+
+        out vec4 colour;
+
+        void main() {
+            // Pixels from the top-left corner to clip space
+            vec2 ndc = vertexPosition / screenSize * 2.0 - 1.0;
+            gl_Position = vec4(ndc.x, -ndc.y, 0.0, 1.0);
+            colour = vertexColour;
+        }
+    ''',
+
+    "fragment_shader" : '''
+        #version 330 core
+        in vec4 colour;
+
+        out vec4 outputColour;
+
+        void main() {
+            outputColour = colour;
+        }
+    '''
+}
+
+######################################################
+# Full-screen movement effect: blue acceleration vignette and radial speed streaks,
+# generated per pixel from a handful of uniforms (drawn as one oversized triangle)
+movement_effect_shader = {
+    "vertex_shader" : '''
+        #version 330 core
+
+        void main() {
+            // Vertices 0, 1, 2 -> (-1,-1), (3,-1), (-1,3): a triangle covering the screen
+            vec2 corner = vec2((gl_VertexID << 1) & 2, gl_VertexID & 2);
+            gl_Position = vec4(corner * 2.0 - 1.0, 0.0, 1.0);
+        }
+    ''',
+
+    "fragment_shader" : '''
+        #version 330 core
+        out vec4 outputColour;
+
+        uniform vec2 screenSize;
+        uniform float accelerationIntensity;
+        uniform float speedRatio;
+        uniform float time;
+
+        const float TAU = 6.2831853;
+        // Angular lanes a streak can run along
+        const float LANES = 240.0;
+
+        float hash(float n) {
+            return fract(sin(n) * 43758.5453);
+        }
+
+        void main() {
+            vec2 offset = gl_FragCoord.xy - 0.5 * screenSize;
+            float radius = length(offset);
+            float maxSide = max(screenSize.x, screenSize.y);
+            bool accelerating = accelerationIntensity > 0.1;
+
+            // Blue vignette closing in from the edges while accelerating
+            vec4 vignette = vec4(0.0, 0.0, 0.5, 0.0);
+            if (accelerating) {
+                float outer = maxSide * 0.7;
+                float inner = outer * (1.0 - accelerationIntensity * 0.5);
+                vignette.a = accelerationIntensity * 0.4 * smoothstep(inner, mix(inner, outer, 0.3), radius);
+            }
+
+            // Radial streaks: each lane holds at most one, lit more often the faster the ship goes
+            float movement = max(speedRatio * 0.6, accelerationIntensity);
+            float streak = 0.0;
+            float angle = atan(offset.y, offset.x) / TAU + 0.5;
+            float lane = floor(angle * LANES);
+            float seed = hash(lane);
+            if (seed < movement * 0.5) {
+                float across = abs(fract(angle * LANES) - 0.5) / LANES * TAU * radius;
+                float streakLength = mix(20.0, 100.0, hash(lane + 7.0)) * movement;
+                float head = fract(time * (0.3 + seed) * (0.5 + movement) + hash(lane + 17.0)) * maxSide * 0.75;
+                float behind = head - radius;
+                float body = step(0.0, behind) * (1.0 - smoothstep(0.0, streakLength, behind));
+                float width = 1.0 - smoothstep(0.5, 1.25, across);
+                // Streaks start a little away from the center, where the lanes are too narrow
+                float fade = smoothstep(0.05 * maxSide, 0.2 * maxSide, radius);
+                streak = mix(0.3, 0.9, hash(lane + 31.0)) * movement * (accelerating ? 1.0 : 0.8) * body * width * fade;
+            }
+            vec3 streakColour = accelerating ? vec3(0.9, 0.9, 1.0) : vec3(0.7, 0.8, 1.0);
+
+            // Streaks over the vignette
+            float alpha = streak + vignette.a * (1.0 - streak);
+            vec3 colour = (streakColour * streak + vignette.rgb * vignette.a * (1.0 - streak)) / max(alpha, 1e-4);
+            outputColour = vec4(colour, alpha);
+        }
+    '''
+}
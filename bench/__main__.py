@@ -0,0 +1,176 @@
+"""Run the benchmark scenarios and print the results as JSON.
+
+    python -m bench                          # every scenario, headless
+    python -m bench chase_1000 --seed 7      # one scenario
+    python -m bench cruise --mode offscreen  # with rendering, in a hidden window
+    python -m bench idle --record idle.json  # save the input stream ...
+    python -m bench idle --replay idle.json  # ... and replay it later
+
+Run it from the repository root; models are loaded by relative path.
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from bench import enter_repo_root
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Deterministic game benchmarks")
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    parser.add_argument("--mode", choices=("headless", "offscreen"), default="headless")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--frames", type=int, help="override each scenario's frame count")
+    parser.add_argument("--fps", type=float, default=60.0, help="simulated frame rate of the input stream")
+    parser.add_argument("--warmup", type=int, default=30, help="frames left out of the percentiles")
+    parser.add_argument("--record", help="write the generated input stream to this file")
+    parser.add_argument("--replay", help="read the input stream from this file instead")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace peak Python memory (slower)")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def percentiles(values):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {"mean": float(values.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "max": float(values.max())}
+
+def run_scenario(scenario, stream, args, window=None):
+    from game import Game, GameScreen
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+
+    if window is None:
+        game = Game(1080, 1920, None, headless=True)
+    else:
+        game = Game(window.windowHeight, window.windowWidth, window.impl)
+    game.invulnerable = True
+    # Phase percentiles are reported, but per-call trace events would skew the allocation counts
+    game.profiler.trace = False
+
+    def start():
+        game.StartMission()
+        if scenario.setup is not None:
+            scenario.setup(game)
+
+    start()
+    missions = 1
+    delta_time = 1.0 / args.fps
+    frame_ms = []
+    start_tick = game.tick_time
+    gc.collect()
+    gc_before = [stats["collections"] for stats in gc.get_stats()]
+    blocks_before = sys.getallocatedblocks()
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    run_start = time.perf_counter()
+    for frame, pressed in enumerate(stream):
+        inputs = game.BlankInputs()
+        for key in pressed:
+            inputs[key] = True
+
+        frame_start = time.perf_counter()
+        if window is not None:
+            # Clears the frame; the polled inputs are replaced by the recorded ones
+            window.StartFrame(0.0, 0.0, 0.0, 1.0)
+        game.Step(inputs, delta_time)
+        if window is not None:
+            window.EndFrame()
+        if frame >= args.warmup:
+            frame_ms.append((time.perf_counter() - frame_start) * 1000.0)
+
+        # A won mission restarts so the workload stays comparable
+        if game.screen != GameScreen.GAME:
+            start()
+            missions += 1
+    elapsed = time.perf_counter() - run_start
+
+    result = {
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "mode": args.mode,
+        "seed": args.seed,
+        "frames": len(stream),
+        "ticks": int(round((game.tick_time - start_tick) * game.tick_rate)),
+        "seconds": elapsed,
+        "missions": missions,
+    }
+    result["frames_per_second"] = len(stream) / elapsed
+    result["ticks_per_second"] = result["ticks"] / elapsed
+    result["frame_ms"] = percentiles(frame_ms)
+    result["phases_ms"] = game.profiler.report()
+    # Per-frame counts such as objects drawn and culled (rendering modes only)
+    result["counters"] = game.profiler.counters()
+    result["allocations"] = {
+        # Net Python heap blocks still allocated, and GC runs per generation (a proxy for churn)
+        "allocated_blocks_delta": sys.getallocatedblocks() - blocks_before,
+        "gc_collections": [stats["collections"] - before for stats, before in zip(gc.get_stats(), gc_before)],
+    }
+    if args.tracemalloc:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["allocations"]["tracemalloc_peak_kb"] = peak / 1024.0
+    result["entities"] = {
+        "pirates": len(game.gameState["pirates"]),
+        "lasers_high_water_mark": game.gameState["laser_pool"].high_water_mark,
+    }
+
+    game.ReleaseScene()
+    return result
+
+def main():
+    args = parse_args()
+    enter_repo_root()
+    from bench.scenarios import SCENARIOS
+
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:12s} {scenario.frames:6d} frames  {scenario.description}")
+        return
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(unknown)}. Available: {', '.join(SCENARIOS)}")
+    if (args.record or args.replay) and len(names) != 1:
+        sys.exit("--record and --replay take a single scenario")
+
+    window = None
+    if args.mode == "offscreen":
+        from utils.window_manager import Window
+        window = Window(visible=False)
+
+    results = []
+    for name in names:
+        scenario = SCENARIOS[name]
+        if args.replay:
+            with open(args.replay) as file:
+                recorded = json.load(file)
+            stream, args.fps = recorded["frames"], recorded["fps"]
+        else:
+            stream = scenario.input_stream(args.seed, args.frames)
+        if args.record:
+            with open(args.record, "w") as file:
+                json.dump({"scenario": name, "seed": args.seed, "fps": args.fps, "frames": stream}, file)
+        results.append(run_scenario(scenario, stream, args, window))
+
+    if window is not None:
+        window.Close()
+
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Time a cold load of every scene model with an increasing number of worker processes.
+
+    python -m bench.asset_loading [--workers 1 2 4] [--repeat 3]
+
+The binary mesh cache is bypassed, so every run parses the OBJ files. Only the
+CPU side is measured; the GPU uploads happen on the main thread either way.
+"""
+import argparse
+import json
+import os
+import time
+
+from bench import enter_repo_root
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.asset_loading")
+    parser.add_argument("--workers", type=int, nargs="+", help="worker counts to try (default: 1 up to one per core)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    enter_repo_root()
+    from assets.objects.objects import load_mesh_levels
+    from game import SCENE_OBJECT_TYPES
+    from utils.asset_loader import load_all
+
+    paths = [object_type.MODEL_PATH for object_type in SCENE_OBJECT_TYPES]
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    report = {"cores": cores, "models": len(paths), "load_ms": {}}
+    for workers in worker_counts:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            load_all(load_mesh_levels, paths, workers)
+            times.append(time.perf_counter() - start)
+        report["load_ms"][workers] = min(times) * 1000.0
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
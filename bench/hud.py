@@ -0,0 +1,64 @@
+"""Time the HUD widgets with and without the cached speed gauge geometry.
+
+    python -m bench.hud [--frames 2000]
+
+Runs the widgets in a real imgui context without a window: draw lists are
+built as in the game, only the final GL upload is skipped. Reports the mean
+CPU time per frame of every widget, in milliseconds. Without a GL context
+the cached gauge is replayed from its recorded draw calls rather than baked
+into textures as in the game, so the cached times are an upper bound.
+"""
+import argparse
+import json
+import time
+
+from bench import enter_repo_root
+
+def time_widgets(game, frames, cache):
+    import imgui
+    game.cache_hud_geometry = cache
+    game.speed_gauge = None
+    totals = dict.fromkeys(game.hud.callbacks, 0.0)
+    for _ in range(frames):
+        imgui.new_frame()
+        for name, callback in game.hud.callbacks.items():
+            start = time.perf_counter()
+            callback()
+            totals[name] += time.perf_counter() - start
+        imgui.render()
+    return {name: total * 1000.0 / frames for name, total in totals.items()}
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.hud")
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+    enter_repo_root()
+    import random
+    import imgui
+    import numpy as np
+    from game import Game
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    width, height = 1920, 1080
+    context = imgui.create_context()
+    io = imgui.get_io()
+    io.display_size = width, height
+    io.fonts.get_tex_data_as_rgba32()
+
+    # A headless game has no GL objects, but its HUD widgets draw normally
+    game = Game(height, width, None, headless=True)
+    game.StartMission()
+    game.gameState["transporter"].velocity[:] = (40.0, 0.0, 0.0)
+
+    before = time_widgets(game, args.frames, cache=False)
+    after = time_widgets(game, args.frames, cache=True)
+    report = {"frames": args.frames, "uncached_ms": before, "cached_ms": after,
+              "speed_display_speedup": before["DrawSpeedDisplay"] / after["DrawSpeedDisplay"]}
+    print(json.dumps(report, indent=2))
+    game.ReleaseScene()
+    imgui.destroy_context(context)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Report how much GPU memory vertex welding saves for every bundled model.
+
+    python -m bench.meshes
+"""
+import glob
+import json
+import os
+
+from bench import enter_repo_root
+
+def main():
+    enter_repo_root()
+    from assets.objects.objects import load_and_process_obj
+    from utils.mesh_utils import weld_vertices, mesh_memory, VERTEX_STRIDE
+
+    report = {}
+    for model_path in sorted(glob.glob(os.path.join('assets', 'objects', 'models', '*.obj'))):
+        properties = load_and_process_obj(model_path)
+        vertices, indices = properties['vertices'], properties['indices']
+        welded_vertices, welded_indices = weld_vertices(vertices, indices)
+        before = mesh_memory(vertices, indices)
+        after = mesh_memory(welded_vertices, welded_indices)
+        report[os.path.basename(model_path)] = {
+            "triangles": len(indices) // 3,
+            "vertices_before": len(vertices) // VERTEX_STRIDE,
+            "vertices_after": len(welded_vertices) // VERTEX_STRIDE,
+            "index_type": str(welded_indices.dtype),
+            "bytes_before": before,
+            "bytes_after": after,
+            "saved_percent": 100.0 * (before - after) / before,
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare the bulk OBJ parser against the line-by-line one on every bundled model.
+
+    python -m bench.obj_parser [--repeat 10] [model.obj ...]
+
+"parse" times load_obj_file against mesh_utils.parse_obj. "load" times the
+original per-corner expansion (reproduced below as the baseline) against
+load_and_process_obj. Both report the best of --repeat runs, in milliseconds.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+import numpy as np
+
+from bench import enter_repo_root
+
+def line_by_line_load(model_path):
+    """load_and_process_obj as it was before the bulk parser: one Python step per face corner."""
+    from assets.objects.objects import load_obj_file
+    vertices, normals, _, faces = load_obj_file(model_path)
+    vertices_with_normals = []
+    for face in faces:
+        for v_idx, _, n_idx in face:
+            normal = normals[n_idx] if n_idx != -1 else [0, 0, 1]
+            vertices_with_normals.extend([*vertices[v_idx], *normal])
+    return np.array(vertices_with_normals, dtype=np.float32)
+
+def best_time(function, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(path)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000.0, result
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench.obj_parser")
+    parser.add_argument("models", nargs="*")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    enter_repo_root()
+    from assets.objects.objects import load_obj_file, load_and_process_obj
+    from utils.mesh_utils import parse_obj
+
+    models = args.models or sorted(glob.glob(os.path.join('assets', 'objects', 'models', '*.obj')))
+    report = {}
+    for model_path in models:
+        old_parse, _ = best_time(load_obj_file, model_path, args.repeat)
+        new_parse, _ = best_time(parse_obj, model_path, args.repeat)
+        old_load, old_vertices = best_time(line_by_line_load, model_path, args.repeat)
+        new_load, properties = best_time(load_and_process_obj, model_path, args.repeat)
+        report[os.path.basename(model_path)] = {
+            "parse_ms": {"line_by_line": old_parse, "bulk": new_parse, "speedup": old_parse / new_parse},
+            "load_ms": {"line_by_line": old_load, "bulk": new_load, "speedup": old_load / new_load},
+            # Only triangle meshes can match: the old loader didn't triangulate larger polygons
+            "same_vertices": bool(np.array_equal(old_vertices, properties['vertices'])),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import random
+import numpy as np
+from assets.objects.objects import Pirate
+
+class Scenario:
+    """A seeded benchmark run: scene setup plus a scripted input stream.
+
+    script(frame, rng) returns the keys held on that frame. The stream is
+    generated up front, so it can be saved and replayed exactly.
+    """
+    def __init__(self, name, frames, script, setup=None, description=""):
+        self.name = name
+        self.frames = frames
+        self.script = script
+        self.setup = setup
+        self.description = description
+
+    def input_stream(self, seed, frames=None):
+        rng = random.Random(seed)
+        return [sorted(self.script(frame, rng)) for frame in range(frames or self.frames)]
+
+def no_input(frame, rng):
+    return ()
+
+def cruise_script(frame, rng):
+    # Full thrust with a different gentle manoeuvre every two seconds
+    manoeuvres = ((), ("W",), ("A",), ("Q",), ("S", "D"), ("E",))
+    return ("SPACE",) + manoeuvres[(frame // 120) % len(manoeuvres)]
+
+def fire_script(frame, rng):
+    # Hold the trigger and sweep the aim so lasers spread over the scene
+    sweep = ("W",) if (frame // 90) % 2 == 0 else ("S",)
+    return ("F",) + sweep
+
+def first_person(game):
+    game.gameState["transporter"].view = 2
+
+def add_pirates(total):
+    def setup(game):
+        pirates = game.gameState["pirates"]
+        graphics = not game.headless
+        start = game.gameState["transporter"].position
+        while len(pirates) < total:
+            pirate = Pirate(graphics=graphics)
+            position = np.array([random.uniform(game.worldMin[i], game.worldMax[i]) for i in range(3)],
+                                dtype=np.float32)
+            # Keep clear of the player so the swarm has to chase
+            if np.linalg.norm(position - start) < 500.0:
+                position += np.float32(600.0) * (position - start) / max(np.linalg.norm(position - start), 1e-3)
+            pirate.set_position(position)
+            pirates.append(pirate)
+    return setup
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario("idle", 600, no_input,
+             description="Default mission (30 planets, 10 pirates) with no input"),
+    Scenario("chase_1000", 600, cruise_script, setup=add_pirates(1000),
+             description="1000 pirates chasing a cruising transporter"),
+    Scenario("laser_fire", 600, fire_script, setup=first_person,
+             description="Sustained laser fire in first-person view"),
+    Scenario("cruise", 3600, cruise_script,
+             description="One minute of full-thrust flight with manoeuvres"),
+)}
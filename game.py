@@ -1,149 +1,370 @@
-import imgui
 import numpy as np
-from utils.graphics import Object, Camera, Shader
+try:
+    import imgui
+except ImportError:
+    # Only needed to draw; headless games run without imgui
+    imgui = None
+from utils.graphics import Object, Camera, InstancedRenderer, OverlayBatch, FullScreenPass, transformBatch
+from utils.particles import SpeedLines, line_triangles, ring_triangles
+from utils.spatial_index import SpatialGrid
+from utils.profiler import Profiler
+from utils.hud import Hud, DrawCommands, BakedDrawCommands
 import sys
 import time
 from enum import Enum, auto
 import random
-from assets.objects.objects import Pirate, Transporter, Planet, SpaceStation
-from assets.shaders.shaders import standard_shader, laser_shader, minimap_shader, crosshair_shader, destination_shader
+from assets.objects.objects import Pirate, Transporter, Planet, SpaceStation, Laser, LaserPool, entity_ids, entity_store, REFERENCE_TICK_RATE, preload_meshes, discard_preloaded_meshes, acquire_shader
+from assets.shaders.shaders import standard_shader, laser_shader, minimap_shader, crosshair_shader, destination_shader, destination_instanced_shader, overlay_shader, movement_effect_shader
+
+# Every object type InitScene creates, so their models can be loaded up front
+SCENE_OBJECT_TYPES = (Transporter, Laser, Planet, SpaceStation, Pirate)
 
 class GameScreen(Enum):
     MAIN_MENU = auto()
+    LOADING = auto()
     GAME = auto()
     WIN = auto()
     GAME_OVER = auto()
 
 class Game:
-    def __init__(self, height, width, gui):
+    def __init__(self, height, width, gui, headless=False, tick_rate=60.0):
         self.gui = gui
+        # Headless games simulate only: no GL objects, no drawing and no imgui
+        self.headless = headless
+        self.sim_time = 0.0
+        # The simulation advances in fixed ticks; rendering blends between the last two
+        self.fixed_timestep = True
+        self.tick_rate = tick_rate
+        self.tick_time = 0.0
+        self.accumulator = 0.0
+        # Longest frame the simulation catches up on, so a stall can't snowball
+        self.max_frame_time = 0.25
+        self.frame_time = 0.0
+        self.camera_previous = None
+        self.camera_current = None
         self.height = height
         self.width = width
         self.screen = GameScreen.MAIN_MENU
-        self.speed_lines = []  # For speed line effect
+        # Speed line effect: particles in arrays, drawn with the acceleration ring in one batch
+        self.speed_lines = SpeedLines()
+        self.speed_line_density = 25  # Lines on screen at full movement intensity
+        self.overlay_batch = None
+        # Draw the vignette and streaks procedurally in a full-screen shader pass instead
+        self.gpu_movement_effect = True
+        self.movement_effect_pass = None
+        self.effect_time = 0.0
         self.acceleration_effect_intensity = 0.0
         self.acceleration_color_tint = np.array([0.0, 0.0, 0.2, 0.0], dtype=np.float32)
+        # Planets, stations, pirates and lasers sharing a mesh are drawn in one call
+        self.use_instancing = True
+        self.renderer = InstancedRenderer()
+        # Skip objects whose bounding sphere lies outside the camera's view frustum
+        self.frustum_culling = True
+        # Draw simpler meshes for objects this small on screen (bounding radius in pixels),
+        # one threshold per level after the first; switching back needs the hysteresis margin
+        self.use_lods = True
+        self.lod_screen_radii = (40.0, 10.0)
+        self.lod_hysteresis = 0.2
+        # Broad phase for laser hits; cells are larger than the biggest collision sphere
+        self.collision_grid = SpatialGrid(cell_size=250.0, margin=62.5)
+        # Test the whole path a laser moved this frame, so fast shots can't tunnel through targets
+        self.swept_collisions = True
+        # Pirates can't end the mission (used by scripted benchmark runs)
+        self.invulnerable = False
+        # Per-phase frame timings; 'P' toggles the overlay
+        self.profiler = Profiler(gpu=not headless)
+        self.show_profiler = False
+        self.trace_path = "frame_trace.json"
+        # Every imgui widget is drawn in one imgui frame per render, in this order
+        self.hud = Hud(gui)
+        # Static speed gauge geometry, rebuilt only when the resolution or max speed changes
+        self.cache_hud_geometry = True
+        self.speed_gauge = None
+        self.hud.Register("DrawCrosshair", self.DrawCrosshair)
+        self.hud.Register("DrawMinimapArrow", self.DrawMinimapArrow)
+        self.hud.Register("DrawSpeedDisplay", self.DrawSpeedDisplay)
+        self.hud.Register("DrawText", self.DrawText)
+        self.hud.Register("DrawProfilerOverlay", self.DrawProfilerOverlay)
+        # Worker processes parsing models at scene start (None: one per core)
+        self.asset_workers = None
+        # Scene building runs at most this long per frame behind the loading screen (seconds)
+        self.loading_budget = 0.008
+        self.mesh_loader = None
+        self.scene_builder = None
+        self.loading_progress = 0.0
+
+    def ReleaseScene(self):
+        """Release the GPU resources held by the objects of the previous mission."""
+        if hasattr(self, "camera"):
+            self.camera.Delete()
+        if not hasattr(self, "gameState"):
+            return
+        if "transporter" in self.gameState:
+            self.gameState["transporter"].Delete()
+        for key in ("planets", "spaceStations", "pirates"):
+            for obj in self.gameState.get(key, []):
+                obj.Delete()
+        # Lasers are owned by the pool, which frees them all at once
+        if "laser_pool" in self.gameState:
+            self.gameState["laser_pool"].Delete()
+        self.gameState = {}
 
     def InitScene(self):
         if self.screen == GameScreen.GAME:
-            self.camera = Camera(self.height, self.width)
-            self.shaders = []
-            self.gameState = {}
+            self.ReleaseScene()
+            for _ in self.BuildScene():
+                pass
+
+    def BeginLoading(self):
+        """Start a new mission that is built over the next frames, behind a loading screen."""
+        self.ReleaseScene()
+        self.screen = GameScreen.LOADING
+        self.loading_progress = 0.0
+        if not self.headless:
+            # Models are read and parsed on a worker thread while the loading screen keeps drawing
+            model_paths = [object_type.MODEL_PATH for object_type in SCENE_OBJECT_TYPES]
+            self.mesh_loader = preload_meshes(model_paths, self.asset_workers, background=True)
+        self.scene_builder = self.BuildScene()
+
+    def ContinueLoading(self):
+        """Build as much of the scene as loading_budget allows, once the model arrays are in."""
+        if self.mesh_loader is not None:
+            self.mesh_loader.check()
+            if not self.mesh_loader.done:
+                # Loading the models counts as the first half of the progress bar
+                self.loading_progress = 0.5 * self.mesh_loader.progress
+                return
+            self.mesh_loader = None
+
+        # The GL uploads and shader compiles of one object are the smallest step
+        deadline = time.perf_counter() + self.loading_budget
+        for progress in self.scene_builder:
+            self.loading_progress = 0.5 + 0.5 * progress
+            if time.perf_counter() >= deadline:
+                return
+        self.scene_builder = None
+        self.screen = GameScreen.GAME
+
+    def BuildScene(self):
+        """Create the objects of a new mission, yielding the fraction built after each one.
+
+        Meshes and shaders are uploaded as the objects are created, so a caller
+        can spread the build over several frames. ReleaseScene() must run first.
+        """
+        self.camera = Camera(self.height, self.width)
+        self.accumulator = 0.0
+        self.camera_previous = None
+        self.camera_current = None
+        self.gameState = {}
+        
+        self.worldMin = np.array([-5000, -5000, -5000], dtype=np.float32)
+        self.worldMax = np.array([5000, 5000, 5000], dtype=np.float32)
+        
+        self.n_planets = 30
+        self.n_pirates = 10
+        # Each yield hands back the fraction of the scene built so far
+        steps = 2 + self.n_planets + self.n_pirates
+        built = 0
+
+        graphics = not self.headless
+        if graphics:
+            # Parse every model in parallel first; the GPU uploads below stay on this thread
+            preload_meshes([object_type.MODEL_PATH for object_type in SCENE_OBJECT_TYPES], self.asset_workers)
+        self.gameState["transporter"] = Transporter(graphics=graphics)
+        built += 1
+        yield built / steps
+        
+        self.gameState["planets"] = []
+        self.gameState["spaceStations"] = []
+        self.gameState["pirates"] = []
+        
+        # Lasers are preallocated for sustained fire; the "lasers" list is the pool's active set
+        self.gameState["laser_pool"] = LaserPool(capacity=LaserPool.capacity_for(self.tick_rate), graphics=graphics)
+        self.gameState["lasers"] = self.gameState["laser_pool"].active
+        built += 1
+        yield built / steps
+        
+        # Create random planets
+        for i in range(self.n_planets):
+            planet = Planet(graphics=graphics)
+            random_pos = np.array([
+                random.uniform(self.worldMin[0], self.worldMax[0]),
+                random.uniform(self.worldMin[1], self.worldMax[1]),
+                random.uniform(self.worldMin[2], self.worldMax[2])
+            ], dtype=np.float32)
+            planet.set_position(random_pos)
             
-            self.worldMin = np.array([-5000, -5000, -5000], dtype=np.float32)
-            self.worldMax = np.array([5000, 5000, 5000], dtype=np.float32)
+            random_color = np.array([
+                random.uniform(0.3, 1.0),
+                random.uniform(0.3, 1.0),
+                random.uniform(0.3, 1.0),
+                1.0
+            ], dtype=np.float32)
+            planet.set_color(random_color)
+            self.gameState["planets"].append(planet)
             
-            self.gameState["transporter"] = Transporter()
-            self.shaders.append(self.gameState["transporter"].shader)
+            # Create a space station for each planet
+            station = SpaceStation(graphics=graphics)
+            orbit_radius = 150.0
+            orbit_angle = random.uniform(0, 2 * np.pi)
+            station_pos = random_pos + np.array([
+                orbit_radius * np.cos(orbit_angle),
+                0,  # Keep on same y-level as planet
+                orbit_radius * np.sin(orbit_angle)
+            ], dtype=np.float32)
+            station.set_position(station_pos)
+            station.parent_planet = planet
+            station.orbit_angle = orbit_angle
+            station.orbit_radius = orbit_radius
+            station.orbit_speed = random.uniform(0.2, 0.5)
+            self.gameState["spaceStations"].append(station)
+            built += 1
+            yield built / steps
+
+        # Randomly choose start and destination
+        if len(self.gameState["spaceStations"]) >= 2:
+            start_idx = random.randrange(0, len(self.gameState["spaceStations"]))
+            dest_idx = start_idx
+            while dest_idx == start_idx:
+                dest_idx = random.randrange(0, len(self.gameState["spaceStations"]))
+            
+            self.gameState["start_station"] = self.gameState["spaceStations"][start_idx]
+            self.gameState["destination_station"] = self.gameState["spaceStations"][dest_idx]
             
-            self.gameState["planets"] = []
-            self.gameState["spaceStations"] = []
-            self.gameState["pirates"] = []
-            self.gameState["lasers"] = []
+            # Set transporter at start station
+            start_pos = self.gameState["start_station"].position.copy()
+            start_pos += np.array([0, 20, 0], dtype=np.float32)
+            self.gameState["transporter"].set_position(start_pos)
+            self.gameState["transporter"].start_planet = self.gameState["start_station"].parent_planet
+            self.gameState["transporter"].target_planet = self.gameState["destination_station"].parent_planet
             
-            # Create random planets
-            self.n_planets = 30
-            for i in range(self.n_planets):
-                planet = Planet()
+            # Make the destination planet distinct
+            dest_planet = self.gameState["destination_station"].parent_planet
+            if dest_planet.graphics_obj is not None:
+                dest_planet.graphics_obj.properties['scale'] *= 1.2
+            dest_planet.set_shader(destination_shader, destination_instanced_shader)
+            dest_planet.set_color(np.array([1.0, 0.9, 0.3, 1.0]))
+            
+        # Initialize Pirates
+        for i in range(self.n_pirates):
+            pirate = Pirate(graphics=graphics)
+            
+            # Generate random position away from player start
+            while True:
                 random_pos = np.array([
                     random.uniform(self.worldMin[0], self.worldMax[0]),
                     random.uniform(self.worldMin[1], self.worldMax[1]),
                     random.uniform(self.worldMin[2], self.worldMax[2])
                 ], dtype=np.float32)
-                planet.set_position(random_pos)
-                
-                random_color = np.array([
-                    random.uniform(0.3, 1.0),
-                    random.uniform(0.3, 1.0),
-                    random.uniform(0.3, 1.0),
-                    1.0
-                ], dtype=np.float32)
-                planet.set_color(random_color)
-                self.gameState["planets"].append(planet)
-                self.shaders.append(planet.shader)
-                
-                # Create a space station for each planet
-                station = SpaceStation()
-                orbit_radius = 150.0
-                orbit_angle = random.uniform(0, 2 * np.pi)
-                station_pos = random_pos + np.array([
-                    orbit_radius * np.cos(orbit_angle),
-                    0,  # Keep on same y-level as planet
-                    orbit_radius * np.sin(orbit_angle)
-                ], dtype=np.float32)
-                station.set_position(station_pos)
-                station.parent_planet = planet
-                station.orbit_angle = orbit_angle
-                station.orbit_radius = orbit_radius
-                station.orbit_speed = random.uniform(0.2, 0.5)
-                self.gameState["spaceStations"].append(station)
-                self.shaders.append(station.shader)
-
-            # Randomly choose start and destination
-            if len(self.gameState["spaceStations"]) >= 2:
-                start_idx = random.randrange(0, len(self.gameState["spaceStations"]))
-                dest_idx = start_idx
-                while dest_idx == start_idx:
-                    dest_idx = random.randrange(0, len(self.gameState["spaceStations"]))
-                
-                self.gameState["start_station"] = self.gameState["spaceStations"][start_idx]
-                self.gameState["destination_station"] = self.gameState["spaceStations"][dest_idx]
-                
-                # Set transporter at start station
-                start_pos = self.gameState["start_station"].position.copy()
-                start_pos += np.array([0, 20, 0], dtype=np.float32)
-                self.gameState["transporter"].set_position(start_pos)
-                self.gameState["transporter"].start_planet = self.gameState["start_station"].parent_planet
-                self.gameState["transporter"].target_planet = self.gameState["destination_station"].parent_planet
-                
-                # Make the destination planet distinct
-                dest_planet = self.gameState["destination_station"].parent_planet
-                dest_planet.graphics_obj.properties['scale'] *= 1.2
-                dest_planet.shader = Shader(destination_shader["vertex_shader"], 
-                                         destination_shader["fragment_shader"])
-                dest_planet.graphics_obj.shader = dest_planet.shader
-                self.shaders.append(dest_planet.shader)
-                dest_planet.set_color(np.array([1.0, 0.9, 0.3, 1.0]))
-                
-            # Initialize Pirates
-            self.n_pirates = 10
-            for i in range(self.n_pirates):
-                pirate = Pirate()
                 
-                # Generate random position away from player start
-                while True:
-                    random_pos = np.array([
-                        random.uniform(self.worldMin[0], self.worldMax[0]),
-                        random.uniform(self.worldMin[1], self.worldMax[1]),
-                        random.uniform(self.worldMin[2], self.worldMax[2])
-                    ], dtype=np.float32)
-                    
-                    if "start_station" in self.gameState:
-                        distance = np.linalg.norm(random_pos - self.gameState["start_station"].position)
-                        if distance > 500.0:  # Safe distance from player start
-                            break
-                    else:
+                if "start_station" in self.gameState:
+                    distance = np.linalg.norm(random_pos - self.gameState["start_station"].position)
+                    if distance > 500.0:  # Safe distance from player start
                         break
-                
-                pirate.set_position(random_pos)
-                self.gameState["pirates"].append(pirate)
-                self.shaders.append(pirate.shader)
+                else:
+                    break
+            
+            pirate.set_position(random_pos)
+            self.gameState["pirates"].append(pirate)
+            built += 1
+            yield built / steps
+
+        # Arrays of models no object ended up using aren't kept around
+        discard_preloaded_meshes()
 
     def ProcessFrame(self, inputs, time):
+        with self.profiler.phase("ProcessFrame"):
+            self.ProcessFrameTimed(inputs, time)
+        self.profiler.end_frame()
+
+    def ProcessFrameTimed(self, inputs, time):
         # Handle view toggle with '1' key
         if (inputs["1"] or inputs['R_CLICK']) and not hasattr(self, "key_cooldown"):
             if self.screen == GameScreen.GAME and "transporter" in self.gameState:
                 self.gameState["transporter"].toggle_view()
                 self.key_cooldown = 0.2  # Cooldown to prevent multiple toggles
+
+        # Toggle the profiler overlay with 'P'
+        if inputs["P"] and not hasattr(self, "key_cooldown"):
+            self.show_profiler = not self.show_profiler
+            self.key_cooldown = 0.2
     
         if hasattr(self, "key_cooldown"):
             self.key_cooldown -= time["deltaTime"]
             if self.key_cooldown <= 0:
                 delattr(self, "key_cooldown")
                 
-        self.UpdateScene(inputs, time)
-        self.DrawScene()
-        self.DrawText()
+        if self.screen == GameScreen.LOADING:
+            with self.profiler.phase("ContinueLoading"):
+                self.ContinueLoading()
+
+        self.frame_time = time["deltaTime"]
+        if self.fixed_timestep:
+            self.AdvanceSimulation(inputs, time["deltaTime"])
+        else:
+            entity_store.interpolated = False
+            with self.profiler.phase("UpdateScene"):
+                self.UpdateScene(inputs, time)
+        if self.headless:
+            return
+        with self.profiler.phase("DrawScene", gpu=True):
+            self.DrawScene()
+        with self.profiler.phase("DrawHud", gpu=True):
+            self.hud.Draw(self.profiler)
+
+    def AdvanceSimulation(self, inputs, frame_time):
+        """Run the fixed ticks the elapsed time covers, then interpolate the render state."""
+        if self.screen != GameScreen.GAME:
+            self.accumulator = 0.0
+            return
+        tick = 1.0 / self.tick_rate
+        self.accumulator += min(frame_time, self.max_frame_time)
+        if self.camera_current is None:
+            # A new mission always runs its first tick, so there is a camera to draw from
+            self.accumulator = max(self.accumulator, tick)
+        while self.accumulator >= tick and self.screen == GameScreen.GAME:
+            entity_store.begin_tick()
+            self.camera_previous = self.camera_current
+            with self.profiler.phase("UpdateScene"):
+                self.UpdateScene(inputs, {"currentTime": self.tick_time, "deltaTime": tick})
+            self.camera_current = (self.camera.position.copy(), self.camera.lookAt.copy(), self.camera.up.copy())
+            self.tick_time += tick
+            self.accumulator -= tick
+
+        if self.screen != GameScreen.GAME:
+            self.accumulator = 0.0
+            return
+        alpha = self.accumulator / tick
+        entity_store.interpolate(alpha)
+        self.InterpolateCamera(alpha)
+
+    def InterpolateCamera(self, alpha):
+        # The camera follows the interpolated transporter, so it is blended the same way
+        if self.camera_previous is None or self.camera_current is None:
+            return
+        (position0, look0, up0), (position1, look1, up1) = self.camera_previous, self.camera_current
+        self.camera.position = position0 + (position1 - position0) * alpha
+        self.camera.lookAt = look0 + (look1 - look0) * alpha
+        up = up0 + (up1 - up0) * alpha
+        self.camera.up = up / max(np.linalg.norm(up), 1e-6)
+
+    @staticmethod
+    def BlankInputs():
+        """Input dict with nothing pressed, in the format Window.StartFrame returns."""
+        inputs = {key: False for key in ("1", "2", "W", "S", "A", "D", "Q", "E", "F", "P",
+                                         "SPACE", "L_SHIFT", "R_CLICK", "L_CLICK", "ESCAPE")}
+        inputs["mouseDelta"] = [0.0, 0.0]
+        return inputs
+
+    def StartMission(self):
+        """Start a new mission directly, as the "New Game" button does."""
+        self.screen = GameScreen.GAME
+        self.InitScene()
+
+    def Step(self, inputs, delta_time):
+        """Advance the game by delta_time with scripted inputs instead of a window."""
+        self.sim_time += delta_time
+        self.ProcessFrame(inputs, {"currentTime": self.sim_time, "deltaTime": delta_time})
 
     def DrawText(self):
         if self.screen == GameScreen.MAIN_MENU:
@@ -151,7 +372,6 @@ class Game:
             x_pos = (self.width - window_w) / 2
             y_pos = (self.height - window_h) / 2
 
-            imgui.new_frame()
             imgui.set_next_window_position(x_pos, y_pos)
             imgui.set_next_window_size(window_w, window_h)
             imgui.begin("Main Menu", False, imgui.WINDOW_NO_MOVE | imgui.WINDOW_NO_COLLAPSE | imgui.WINDOW_NO_RESIZE)
@@ -159,8 +379,7 @@ class Game:
             button_w, button_h = 150, 40
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
             if imgui.button("New Game", button_w, button_h):
-                self.screen = GameScreen.GAME
-                self.InitScene()
+                self.BeginLoading()
 
             imgui.spacing()
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
@@ -168,15 +387,27 @@ class Game:
                 sys.exit()
 
             imgui.end()
-            imgui.render()
-            self.gui.render(imgui.get_draw_data())
+
+        elif self.screen == GameScreen.LOADING:
+            window_w, window_h = 400, 100
+            x_pos = (self.width - window_w) / 2
+            y_pos = (self.height - window_h) / 2
+
+            imgui.set_next_window_position(x_pos, y_pos)
+            imgui.set_next_window_size(window_w, window_h)
+            imgui.begin("Loading", False, imgui.WINDOW_NO_MOVE | imgui.WINDOW_NO_COLLAPSE | imgui.WINDOW_NO_RESIZE)
+
+            imgui.text("Preparing mission..." if self.mesh_loader is None else "Loading models...")
+            imgui.spacing()
+            imgui.progress_bar(self.loading_progress, (window_w - 16, 0))
+
+            imgui.end()
 
         elif self.screen == GameScreen.WIN:
             window_w, window_h = 400, 200
             x_pos = (self.width - window_w) / 2
             y_pos = (self.height - window_h) / 2
             
-            imgui.new_frame()
             imgui.set_next_window_position(x_pos, y_pos)
             imgui.set_next_window_size(window_w, window_h)
             imgui.begin("MISSION COMPLETE", False, imgui.WINDOW_NO_MOVE | imgui.WINDOW_NO_COLLAPSE | imgui.WINDOW_NO_RESIZE)
@@ -188,8 +419,7 @@ class Game:
             button_w, button_h = 150, 40
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
             if imgui.button("New Mission", button_w, button_h):
-                self.screen = GameScreen.GAME
-                self.InitScene()
+                self.BeginLoading()
                 
             imgui.spacing()
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
@@ -197,15 +427,12 @@ class Game:
                 self.screen = GameScreen.MAIN_MENU
                 
             imgui.end()
-            imgui.render()
-            self.gui.render(imgui.get_draw_data())
 
         elif self.screen == GameScreen.GAME_OVER:
             window_w, window_h = 400, 250
             x_pos = (self.width - window_w) / 2
             y_pos = (self.height - window_h) / 2
             
-            imgui.new_frame()
             imgui.set_next_window_position(x_pos, y_pos)
             imgui.set_next_window_size(window_w, window_h)
             imgui.begin("GAME OVER", False, imgui.WINDOW_NO_MOVE | imgui.WINDOW_NO_COLLAPSE | imgui.WINDOW_NO_RESIZE)
@@ -224,8 +451,7 @@ class Game:
             button_w, button_h = 150, 40
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
             if imgui.button("Try Again", button_w, button_h):
-                self.screen = GameScreen.GAME
-                self.InitScene()
+                self.BeginLoading()
                 
             imgui.spacing()
             imgui.set_cursor_pos_x((window_w - button_w) / 2)
@@ -233,8 +459,6 @@ class Game:
                 self.screen = GameScreen.MAIN_MENU
             
             imgui.end()
-            imgui.render()
-            self.gui.render(imgui.get_draw_data())
 
     def UpdateScene(self, inputs, time):
         delta_time = time['deltaTime']
@@ -264,66 +488,33 @@ class Game:
                 self.camera.lookAt = transporter.forward_direction
             
             # Update pirates
-            player_forward = transporter.forward_direction
-            for pirate in self.gameState["pirates"]:
-                pirate.update(delta_time, transporter_pos, player_forward)
-                
-                # Check for collision with player
-                distance = np.linalg.norm(pirate.position - transporter_pos)
-                if distance < pirate.collision_radius:
+            pirates = self.gameState["pirates"]
+            Pirate.update_all(pirates, delta_time, transporter_pos)
+            
+            # Check for collision with player
+            if pirates and not self.invulnerable:
+                store = transporter.store
+                ids = entity_ids(pirates)
+                distance = np.linalg.norm(store['position'][ids] - transporter_pos, axis=1)
+                if np.any(distance < store['radius'][ids]):
                     self.screen = GameScreen.GAME_OVER
                     return
             
             # Handle laser firing
             current_time = time['currentTime']
             if (inputs["F"] or inputs["L_CLICK"]) and self.gameState['transporter'].can_shoot(current_time):
-                new_laser = self.gameState['transporter'].shoot(current_time)
-                if new_laser:
-                    self.gameState['lasers'].append(new_laser)
-                    if new_laser.shader not in self.shaders:
-                        self.shaders.append(new_laser.shader)
+                self.gameState['transporter'].shoot(current_time, self.gameState['laser_pool'])
             
-            # Update lasers and remove expired ones
-            i = 0
-            while i < len(self.gameState['lasers']):
-                if self.gameState['lasers'][i].update(delta_time):
-                    self.gameState['lasers'].pop(i)
-                else:
-                    i += 1
+            # Update lasers and recycle expired ones
+            self.gameState['laser_pool'].update(delta_time)
 
             # Update space stations orbits
-            for station in self.gameState["spaceStations"]:
-                station.update(delta_time)
+            SpaceStation.update_all(self.gameState["spaceStations"], delta_time)
 
             # Check for laser collisions
-            for i in range(len(self.gameState["lasers"]) - 1, -1, -1):
-                laser = self.gameState["lasers"][i]
-                laser_removed = False
-                
-                # Check collisions with pirates
-                for j in range(len(self.gameState["pirates"]) - 1, -1, -1):
-                    if laser_removed:
-                        break
-                        
-                    pirate = self.gameState["pirates"][j]
-                    distance = np.linalg.norm(laser.position - pirate.position)
-                    if distance < pirate.collision_radius:
-                        self.gameState["pirates"].pop(j)
-                        self.gameState["lasers"].pop(i)
-                        laser_removed = True
-                
-                if laser_removed:
-                    continue
-                    
-                # Check collisions with planets
-                for planet in self.gameState["planets"]:
-                    if laser_removed:
-                        break
-                        
-                    distance = np.linalg.norm(laser.position - planet.position)
-                    if distance < 100.0:  # Planet collision radius
-                        self.gameState["lasers"].pop(i)
-                        laser_removed = True
+            self.ResolveLaserHits()
+
+            self.UpdateAccelerationEffect(delta_time)
 
             # Check for win condition
             if "transporter" in self.gameState and "destination_station" in self.gameState:
@@ -340,63 +531,178 @@ class Game:
                 if distance < 50.0:
                     self.screen = GameScreen.WIN
             
+    def ResolveLaserHits(self):
+        """Remove lasers that hit pirates or planets, and the pirates they hit, in one pass."""
+        lasers = self.gameState["lasers"]
+        pirates = self.gameState["pirates"]
+        targets = pirates + self.gameState["planets"]
+        if not lasers or not targets:
+            return
+
+        store = lasers[0].store
+        target_ids = entity_ids(targets)
+        laser_ids = entity_ids(lasers)
+        self.collision_grid.build(store['position'][target_ids], store['radius'][target_ids])
+        if self.swept_collisions:
+            # Hits are ordered by how far along the frame's path they happen
+            laser_hits, target_hits, hit_order = self.collision_grid.query_segments(
+                store['previous_position'][laser_ids], store['position'][laser_ids])
+        else:
+            # Pirates take priority over planets at the end-of-frame position
+            laser_hits, target_hits = self.collision_grid.query(store['position'][laser_ids])
+            hit_order = target_hits >= len(pirates)
+        if len(laser_hits) == 0:
+            return
+
+        # Each laser keeps its first hit, and each pirate is consumed at most once
+        order = np.lexsort((hit_order, laser_hits))
+        laser_hits, target_hits = laser_hits[order], target_hits[order]
+        _, first = np.unique(laser_hits, return_index=True)
+        laser_hits, target_hits = laser_hits[first], target_hits[first]
+
+        pirate_hit = target_hits < len(pirates)
+        _, first_pirate = np.unique(target_hits[pirate_hit], return_index=True)
+        dead_pirates = set(target_hits[pirate_hit][first_pirate].tolist())
+        spent_lasers = set(laser_hits[~pirate_hit].tolist()) | set(laser_hits[pirate_hit][first_pirate].tolist())
+
+        # Compact both lists once instead of popping inside the loops
+        self.gameState["laser_pool"].release_many([lasers[i] for i in spent_lasers])
+        for i in dead_pirates:
+            pirates[i].Delete()
+        pirates[:] = [pirate for i, pirate in enumerate(pirates) if i not in dead_pirates]
+
     def DrawScene(self):
         if self.screen == GameScreen.GAME: 
-            # Update all shaders
-            for shader in self.shaders:
-               self.camera.Update(shader)
+            # Publish the camera once; every program reads it from the CameraBlock
+            self.camera.Update()
     
             # Only draw the transporter in third-person view
             if self.gameState["transporter"].view == 1:
                 self.gameState["transporter"].Draw()
     
             # Draw all game objects
-            for laser in self.gameState["lasers"]:
-                laser.Draw()
-                
-            for planet in self.gameState["planets"]:
-                planet.Draw()
-                
-            for spaceStation in self.gameState["spaceStations"]:
-                spaceStation.Draw()
-                
-            for pirate in self.gameState["pirates"]:
-                pirate.Draw()
-            
-            # Draw crosshair in first-person view
-            if self.gameState["transporter"].view == 2:
-                self.DrawCrosshair()
-                
-            self.DrawMinimapArrow()
-            self.DrawSpeedDisplay()
+            objects = (self.gameState["lasers"] + self.gameState["planets"] +
+                       self.gameState["spaceStations"] + self.gameState["pirates"])
+            objects = self.VisibleObjects(objects)
+            self.profiler.count("objects drawn", len(objects))
+            self.profiler.count("triangles drawn", sum(obj.graphics_obj.ibo.count for obj in objects) // 3)
+            if self.use_instancing:
+                self.renderer.Begin()
+                for obj in objects:
+                    obj.submit(self.renderer)
+                self.renderer.Draw()
+            else:
+                # Rebuild every changed model matrix in one batch before the per-object draws.
+                # The properties are refreshed from the store first, so the batch sees this
+                # frame's transforms and each Draw finds its row already clean
+                for obj in objects:
+                    obj.sync_graphics()
+                    obj.graphics_obj.SyncTransform()
+                transformBatch.update()
+                for obj in objects:
+                    obj.Draw()
 
-    def DrawSpeedDisplay(self):
-        """Draw a cockpit-styled speed indicator with gauge and status lights"""
-        if "transporter" not in self.gameState:
-            return
-            
-        transporter = self.gameState["transporter"]
-        current_speed = np.linalg.norm(transporter.velocity)
-        max_speed = transporter.max_speed
-        
-        # Calculate acceleration effect intensity
+    def VisibleObjects(self, objects):
+        """Cull the objects outside the camera frustum and pick the level of detail of the rest.
+
+        Both work on the objects' bounding spheres in vectorized passes.
+        """
+        if not objects or not (self.frustum_culling or self.use_lods):
+            return objects
+        # Objects are drawn at their interpolated positions when the store has them
+        positions = entity_store['render_position' if entity_store.interpolated else 'position']
+        centers = positions[entity_ids(objects)]
+        radii = np.fromiter((obj.bounding_radius() for obj in objects), dtype=np.float32, count=len(objects))
+        if self.frustum_culling:
+            visible = self.camera.SpheresVisible(centers, radii)
+            self.profiler.count("objects culled", len(objects) - int(np.count_nonzero(visible)))
+            objects = [obj for obj, keep in zip(objects, visible.tolist()) if keep]
+            centers, radii = centers[visible], radii[visible]
+        if self.use_lods:
+            self.SelectLods(objects, centers, radii)
+        return objects
+
+    def SelectLods(self, objects, centers, radii):
+        """Switch each object to the level of detail its projected size calls for."""
+        size = self.camera.ProjectedRadii(centers, radii)
+        current = np.fromiter((obj.graphics_obj.lod for obj in objects), dtype=np.intp, count=len(objects))
+        thresholds = np.asarray(self.lod_screen_radii, dtype=np.float32)
+        # Threshold k separates level k from level k + 1. An object coarsens once it is
+        # smaller than the threshold minus the margin, and refines once it is larger than
+        # the threshold plus the margin, so sizes near a threshold don't flicker.
+        finer = current[:, None] <= np.arange(len(thresholds))
+        margin = np.where(finer, 1.0 - self.lod_hysteresis, 1.0 + self.lod_hysteresis)
+        level = np.count_nonzero(size[:, None] < thresholds * margin, axis=1)
+        for i in np.flatnonzero(level != current).tolist():
+            objects[i].graphics_obj.SetLod(int(level[i]))
+
+    def UpdateAccelerationEffect(self, delta_time):
+        """Ramp the acceleration effect with the change in speed over the last tick."""
+        current_speed = np.linalg.norm(self.gameState["transporter"].velocity)
+        # Threshold and decay were tuned per tick at REFERENCE_TICK_RATE
+        reference_ticks = delta_time * REFERENCE_TICK_RATE
         if hasattr(self, 'last_speed'):
             speed_delta = current_speed - self.last_speed
-            if speed_delta > 0.5:  # Threshold for noticeable acceleration
+            if speed_delta > 0.5 * reference_ticks:  # Threshold for noticeable acceleration
                 self.acceleration_effect_intensity = min(1.0, self.acceleration_effect_intensity + speed_delta * 0.01)
             else:
-                self.acceleration_effect_intensity = max(0.0, self.acceleration_effect_intensity - 0.02)
+                self.acceleration_effect_intensity = max(0.0, self.acceleration_effect_intensity - 0.02 * reference_ticks)
         else:
             self.acceleration_effect_intensity = 0.0
         
         self.last_speed = current_speed
-        
-        imgui.new_frame()
-        draw_list = imgui.get_background_draw_list()
-        speed_percent = current_speed / max_speed
-        
-        # ----- COCKPIT-STYLE SPEED DISPLAY -----
-        
+
+    def DrawProfilerOverlay(self):
+        """Show rolling per-phase frame timings from the profiler."""
+        if not self.show_profiler:
+            return
+        imgui.set_next_window_position(self.width - 420, 180, imgui.FIRST_USE_EVER)
+        imgui.set_next_window_size(400, 0, imgui.FIRST_USE_EVER)
+        imgui.begin("Profiler", False, imgui.WINDOW_NO_COLLAPSE)
+
+        imgui.text(f"frame {self.profiler.frame}, simulation at {self.tick_rate:.0f} Hz")
+        imgui.separator()
+        imgui.columns(4, "phases")
+        for header in ("phase (ms)", "p50", "p95", "p99"):
+            imgui.text(header)
+            imgui.next_column()
+        imgui.separator()
+        for name in list(self.profiler.cpu_samples):
+            for label, gpu in ((name, False), ("  gpu", True)):
+                stats = self.profiler.percentiles(name, gpu=gpu)
+                if stats is None:
+                    continue
+                imgui.text(label)
+                imgui.next_column()
+                for value in stats:
+                    imgui.text(f"{value:.2f}")
+                    imgui.next_column()
+        imgui.columns(1)
+        imgui.separator()
+        for name, values in self.profiler.counters().items():
+            imgui.text(f"{name}: {values['last']} (mean {values['mean']:.1f})")
+        imgui.separator()
+
+        if imgui.button("Save trace"):
+            print(f"Profiler trace written to {self.profiler.dump_chrome_trace(self.trace_path)}")
+        imgui.same_line()
+        if imgui.button("Reset"):
+            self.profiler.reset()
+
+        imgui.end()
+
+    def SpeedGaugeLayout(self, max_speed):
+        """Static parts of the speed gauge, recorded once per resolution and max_speed."""
+        key = (self.width, self.height, max_speed)
+        if self.cache_hud_geometry and self.speed_gauge is not None and self.speed_gauge["key"] == key:
+            return self.speed_gauge
+        if self.speed_gauge is not None:
+            self.speed_gauge["base"].Delete()
+            self.speed_gauge["overlay"].Delete()
+        # Drawn before the needle (panel, dial, ticks, cap) and after the bulbs (bulb rims, labels)
+        draw_list = DrawCommands()
+        overlay = DrawCommands()
+
         # 1. Create panel background
         gauge_radius = 60
         panel_width = gauge_radius * 2 + 60
@@ -488,6 +794,74 @@ class Game:
         draw_list.add_circle_filled(center_x, center_y, 8, cap_color)
         cap_border_color = imgui.get_color_u32_rgba(0.6, 0.6, 0.7, 1.0)
         draw_list.add_circle(center_x, center_y, 8, cap_border_color, 0, 1.5)
+
+        # 8. Indicator bulbs: only their fill changes, so the rims are static
+        bulb_radius = 7
+        bulb_spacing = 26
+        num_bulbs = 5
+        bulb_y = panel_y + panel_height - 25
+        bulb_start_x = center_x - ((num_bulbs - 1) * bulb_spacing) / 2
+        bulb_border_color = imgui.get_color_u32_rgba(0.6, 0.6, 0.7, 0.8)
+        for i in range(num_bulbs):
+            overlay.add_circle(bulb_start_x + i * bulb_spacing, bulb_y, bulb_radius, bulb_border_color, 0, 1.5)
+
+        # 9. Add labels under bulbs
+        labels = ["THR", "HI", "MAX", "SYS1", "SYS2"]
+        label_color = imgui.get_color_u32_rgba(0.7, 0.7, 0.8, 0.8)
+        
+        for i, label in enumerate(labels):
+            label_x = bulb_start_x + i * (bulb_spacing+5) - 20
+            label_y = bulb_y + bulb_radius + 5
+            overlay.add_text(label_x, label_y, label_color, label)
+
+        # Bulb colours per state: (on, glow, glow radius scale, off)
+        rgba = imgui.get_color_u32_rgba
+        bulb_colors = [
+            (rgba(0.4, 0.7, 1.0, 0.9), rgba(0.4, 0.7, 1.0, 0.4), 1.8, rgba(0.2, 0.3, 0.5, 0.7)),
+            (rgba(1.0, 0.9, 0.2, 0.9), rgba(1.0, 0.9, 0.2, 0.4), 1.5, rgba(0.5, 0.5, 0.2, 0.7)),
+            (rgba(1.0, 0.3, 0.2, 0.9), rgba(1.0, 0.3, 0.2, 0.4), 1.5, rgba(0.5, 0.2, 0.2, 0.7)),
+            (rgba(0.3, 0.8, 0.4, 0.9), None, 0.0, rgba(0.2, 0.4, 0.2, 0.7)),
+            (rgba(0.4, 0.6, 1.0, 0.9), None, 0.0, rgba(0.2, 0.3, 0.5, 0.7)),
+        ]
+
+        if self.cache_hud_geometry and not self.headless:
+            # Tessellate both layers once into textures, drawn each frame as two images
+            margin = 4
+            bounds = (panel_x - margin, panel_y - margin, panel_x + panel_width + margin, panel_y + panel_height + margin)
+            draw_list = BakedDrawCommands(draw_list, self.gui, bounds)
+            overlay = BakedDrawCommands(overlay, self.gui, bounds)
+
+        self.speed_gauge = {
+            "key": key,
+            "base": draw_list,
+            "overlay": overlay,
+            "center": (center_x, center_y),
+            "gauge_radius": gauge_radius,
+            "bulbs": [(bulb_start_x + i * bulb_spacing, bulb_y) for i in range(num_bulbs)],
+            "bulb_radius": bulb_radius,
+            "bulb_colors": bulb_colors,
+        }
+        return self.speed_gauge
+
+    def DrawSpeedDisplay(self):
+        """Draw a cockpit-styled speed indicator with gauge and status lights"""
+        if self.screen != GameScreen.GAME or "transporter" not in self.gameState:
+            return
+            
+        transporter = self.gameState["transporter"]
+        current_speed = np.linalg.norm(transporter.velocity)
+        max_speed = transporter.max_speed
+        
+        draw_list = imgui.get_background_draw_list()
+        speed_percent = current_speed / max_speed
+        
+        # ----- COCKPIT-STYLE SPEED DISPLAY -----
+        
+        # Panel, dial, ticks and cap only change with the window size or max_speed
+        gauge = self.SpeedGaugeLayout(max_speed)
+        gauge["base"].Replay(draw_list)
+        center_x, center_y = gauge["center"]
+        gauge_radius = gauge["gauge_radius"]
         
         # 6. Draw speed indicator needle
         needle_angle = np.radians(-90 + (270 * speed_percent))
@@ -527,171 +901,86 @@ class Game:
             digital_color, digital_text
         )
         
-        # 8. Add indicator bulbs
-        bulb_radius = 7
-        bulb_spacing = 26
-        num_bulbs = 5
-        bulb_y = panel_y + panel_height - 25
-        bulb_start_x = center_x - ((num_bulbs - 1) * bulb_spacing) / 2
-        
-        for i in range(num_bulbs):
-            bulb_x = bulb_start_x + i * bulb_spacing
-            
-            # Different bulb statuses
-            if i == 0:  # Thrust indicator
-                if transporter.is_accelerating:
-                    bulb_color = imgui.get_color_u32_rgba(0.4, 0.7, 1.0, 0.9)
-                    glow_color = imgui.get_color_u32_rgba(0.4, 0.7, 1.0, 0.4)
-                    draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius * 1.8, glow_color)
-                else:
-                    bulb_color = imgui.get_color_u32_rgba(0.2, 0.3, 0.5, 0.7)
-            elif i == 1:  # High speed indicator
-                if speed_percent > 0.75:
-                    bulb_color = imgui.get_color_u32_rgba(1.0, 0.9, 0.2, 0.9)
-                    glow_color = imgui.get_color_u32_rgba(1.0, 0.9, 0.2, 0.4)
-                    draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius * 1.5, glow_color)
-                else:
-                    bulb_color = imgui.get_color_u32_rgba(0.5, 0.5, 0.2, 0.7)
-            elif i == 2:  # Max speed warning
-                if speed_percent > 0.95:
-                    bulb_color = imgui.get_color_u32_rgba(1.0, 0.3, 0.2, 0.9)
-                    glow_color = imgui.get_color_u32_rgba(1.0, 0.3, 0.2, 0.4)
-                    draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius * 1.5, glow_color)
-                else:
-                    bulb_color = imgui.get_color_u32_rgba(0.5, 0.2, 0.2, 0.7)
-            elif i == 3:  # Random blink - system status
-                if (int(time.time() * 2) % (6 + i)) < 1:
-                    bulb_color = imgui.get_color_u32_rgba(0.3, 0.8, 0.4, 0.9)
-                else:
-                    bulb_color = imgui.get_color_u32_rgba(0.2, 0.4, 0.2, 0.7)
-            else:  # Another random blink - system status
-                if (int(time.time() * 3) % (8 + i)) < 2:
-                    bulb_color = imgui.get_color_u32_rgba(0.4, 0.6, 1.0, 0.9)
-                else:
-                    bulb_color = imgui.get_color_u32_rgba(0.2, 0.3, 0.5, 0.7)
-            
-            # Draw bulb with border
-            draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius, bulb_color)
-            border_color = imgui.get_color_u32_rgba(0.6, 0.6, 0.7, 0.8)
-            draw_list.add_circle(bulb_x, bulb_y, bulb_radius, border_color, 0, 1.5)
-        
-        # 9. Add labels under bulbs
-        labels = ["THR", "HI", "MAX", "SYS1", "SYS2"]
-        label_color = imgui.get_color_u32_rgba(0.7, 0.7, 0.8, 0.8)
+        # 8. Light the indicator bulbs: thrust, high speed, max speed warning and two status blinks
+        now = time.time()
+        lit = (
+            transporter.is_accelerating,
+            speed_percent > 0.75,
+            speed_percent > 0.95,
+            (int(now * 2) % 9) < 1,
+            (int(now * 3) % 12) < 2,
+        )
+        bulb_radius = gauge["bulb_radius"]
+        for (bulb_x, bulb_y), on, (on_color, glow_color, glow_scale, off_color) in zip(gauge["bulbs"], lit, gauge["bulb_colors"]):
+            if on and glow_color is not None:
+                draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius * glow_scale, glow_color)
+            draw_list.add_circle_filled(bulb_x, bulb_y, bulb_radius, on_color if on else off_color)
         
-        for i, label in enumerate(labels):
-            label_x = bulb_start_x + i * (bulb_spacing+5) - 20
-            label_y = bulb_y + bulb_radius + 5
-            draw_list.add_text(label_x, label_y, label_color, label)
+        # 9. Bulb rims and labels
+        gauge["overlay"].Replay(draw_list)
         
         # Draw movement effects
         speed_ratio = current_speed / max_speed
         if speed_ratio > 0.01 or self.acceleration_effect_intensity > 0.01:
-            self.DrawMovementEffect(draw_list, speed_ratio)
-        
-        imgui.render()
-        self.gui.render(imgui.get_draw_data())
+            if self.gpu_movement_effect:
+                self.DrawMovementEffectPass(speed_ratio)
+            else:
+                self.DrawMovementEffect(speed_ratio)
 
-    def DrawMovementEffect(self, draw_list, speed_ratio):
-        """Draw visual effects for movement and acceleration"""
+    def DrawMovementEffect(self, speed_ratio):
+        """Draw the acceleration ring and the speed lines as one batch of screen-space triangles."""
         width, height = self.width, self.height
+        accelerating = self.acceleration_effect_intensity > 0.1
+        parts = []
         
-        # Draw acceleration effect overlay
-        if self.acceleration_effect_intensity > 0.1:
-            alpha = self.acceleration_effect_intensity * 0.4
-            
-            # Draw a gradient from edges to center
-            center_x = width / 2
-            center_y = height / 2
+        # Draw acceleration effect overlay: a ring fading from the edges towards the center
+        if accelerating:
             outer_radius = max(width, height) * 0.7
             inner_radius = outer_radius * (1.0 - self.acceleration_effect_intensity * 0.5)
-            
-            num_segments = 60
-            for i in range(num_segments):
-                angle1 = 2 * np.pi * i / num_segments
-                angle2 = 2 * np.pi * (i + 1) / num_segments
-                
-                x1_outer = center_x + np.cos(angle1) * outer_radius
-                y1_outer = center_y + np.sin(angle1) * outer_radius
-                x2_outer = center_x + np.cos(angle2) * outer_radius
-                y2_outer = center_y + np.sin(angle2) * outer_radius
-                
-                x1_inner = center_x + np.cos(angle1) * inner_radius
-                y1_inner = center_y + np.sin(angle1) * inner_radius
-                x2_inner = center_x + np.cos(angle2) * inner_radius
-                y2_inner = center_y + np.sin(angle2) * inner_radius
-                
-                draw_list.add_quad_filled(
-                    x1_outer, y1_outer,
-                    x2_outer, y2_outer,
-                    x2_inner, y2_inner,
-                    x1_inner, y1_inner,
-                    imgui.get_color_u32_rgba(0.0, 0.0, 0.5, alpha * (1.0 - i/num_segments))
-                )
+            parts.append(ring_triangles(width / 2, height / 2, inner_radius, outer_radius, 60,
+                                        (0.0, 0.0, 0.5), self.acceleration_effect_intensity * 0.4))
         
         movement_intensity = max(speed_ratio * 0.6, self.acceleration_effect_intensity)
+        num_lines = int(max(8, self.speed_line_density * movement_intensity))
+        
+        move_speed = 0.08 if accelerating else 0.05
+        # Line speeds were tuned per frame at the reference rate
+        move_speed *= self.frame_time * REFERENCE_TICK_RATE
+        x0, y0, x1, y1, alpha = self.speed_lines.update(num_lines, width, height, movement_intensity, move_speed)
+        if accelerating:
+            parts.append(line_triangles(x0, y0, x1, y1, (0.9, 0.9, 1.0), alpha * movement_intensity, 1.5))
+        else:
+            parts.append(line_triangles(x0, y0, x1, y1, (0.7, 0.8, 1.0), alpha * movement_intensity * 0.8, 1.5))
         
-        base_num_lines = int(max(8, 25 * movement_intensity))
-        num_lines = base_num_lines
-        
-        if num_lines > 0:
-            if len(self.speed_lines) < num_lines:
-                for _ in range(num_lines - len(self.speed_lines)):
-                    x = random.randint(0, width)
-                    y = random.randint(0, height)
-                    length = random.randint(20, 100) * movement_intensity
-                    angle = random.uniform(-0.3, 0.3)
-                    self.speed_lines.append({
-                        'x': x,
-                        'y': y,
-                        'length': length,
-                        'angle': angle,
-                        'alpha': random.uniform(0.3, 0.9)
-                    })
-            
-            for i, line in enumerate(self.speed_lines):
-                if i >= num_lines:
-                    break
-                
-                dx = line['length'] * np.cos(line['angle'])
-                dy = line['length'] * np.sin(line['angle'])
-                
-                if self.acceleration_effect_intensity > 0.1:
-                    line_color = imgui.get_color_u32_rgba(
-                        0.9, 0.9, 1.0, 
-                        line['alpha'] * movement_intensity
-                    )
-                else:
-                    line_color = imgui.get_color_u32_rgba(
-                        0.7, 0.8, 1.0, 
-                        line['alpha'] * movement_intensity * 0.8
-                    )
-                
-                draw_list.add_line(
-                    line['x'], line['y'],
-                    line['x'] + dx, line['y'] + dy,
-                    line_color, 1.5
-                )
-                
-                move_speed = 0.05
-                if self.acceleration_effect_intensity > 0.1:
-                    move_speed = 0.08
-                
-                line['x'] -= dx * move_speed
-                line['y'] -= dy * move_speed
-                
-                if line['x'] < 0 or line['x'] > width or line['y'] < 0 or line['y'] > height:
-                    line['x'] = random.randint(0, width)
-                    line['y'] = random.randint(0, height)
-                    line['length'] = random.randint(20, 100) * movement_intensity
-                    line['alpha'] = random.uniform(0.3, 0.9)
-            
-            while len(self.speed_lines) > num_lines:
-                self.speed_lines.pop()
+        if self.headless:
+            return
+        if self.overlay_batch is None:
+            self.overlay_batch = OverlayBatch(acquire_shader(overlay_shader))
+        self.overlay_batch.Draw(np.concatenate(parts), width, height)
+
+    def DrawMovementEffectPass(self, speed_ratio):
+        """Draw the acceleration vignette and speed streaks in a full-screen shader pass.
+
+        The CPU only sets four uniforms, however intense the effect gets.
+        """
+        self.effect_time += self.frame_time
+        if self.headless:
+            return
+        if self.movement_effect_pass is None:
+            self.movement_effect_pass = FullScreenPass(acquire_shader(movement_effect_shader))
+        shader = self.movement_effect_pass.shader
+        shader.Use()
+        shader.SetVec2("screenSize", (self.width, self.height))
+        shader.SetFloat("accelerationIntensity", self.acceleration_effect_intensity)
+        shader.SetFloat("speedRatio", speed_ratio)
+        shader.SetFloat("time", self.effect_time)
+        self.movement_effect_pass.Draw()
 
     def DrawCrosshair(self):
         """Draw a simple + crosshair in the center of the screen."""
-        imgui.new_frame()
+        # Only shown in first-person view
+        if self.screen != GameScreen.GAME or self.gameState["transporter"].view != 2:
+            return
         
         center_x = self.width / 2
         center_y = self.height / 2
@@ -713,17 +1002,12 @@ class Game:
             center_x, center_y + size,
             imgui.get_color_u32_rgba(*color), thickness
         )
-        
-        imgui.render()
-        self.gui.render(imgui.get_draw_data())                
 
     def DrawMinimapArrow(self):
         """Draw a 2D arrow pointing to the destination relative to player orientation."""
-        if "destination_station" not in self.gameState or "transporter" not in self.gameState:
+        if self.screen != GameScreen.GAME or "destination_station" not in self.gameState or "transporter" not in self.gameState:
             return
         
-        imgui.new_frame()
-        
         transporter = self.gameState["transporter"]
         player_pos = transporter.position
         destination_pos = self.gameState["destination_station"].position
@@ -736,8 +1020,6 @@ class Game:
         distance = np.linalg.norm(world_direction)
         
         if distance < 10:
-            imgui.render()
-            self.gui.render(imgui.get_draw_data())
             return
         
         if distance > 0:
@@ -879,8 +1161,3 @@ class Game:
         text_color = imgui.get_color_u32_rgba(1.0, 1.0, 1.0, 1.0)
         text_width = len(info_text) * 7
         draw_list.add_text(pos_x - text_width/2, pos_y + circle_radius + 5, text_color, info_text)
-        
-        imgui.render()
-        self.gui.render(imgui.get_draw_data())
-
-
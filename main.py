@@ -2,10 +2,13 @@ from OpenGL.GL import *
 from utils.window_manager import Window
 from game import Game
 
+# Simulation ticks per second, independent of the display's frame rate
+TICK_RATE = 60.0
+
 class App:
     def __init__(self):
         self.window = Window()
-        self.game = Game(self.window.windowHeight, self.window.windowWidth, self.window.impl)
+        self.game = Game(self.window.windowHeight, self.window.windowWidth, self.window.impl, tick_rate=TICK_RATE)
 
     def RenderLoop(self):
 
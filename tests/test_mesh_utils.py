@@ -0,0 +1,25 @@
+import numpy as np
+from utils.mesh_utils import parse_obj
+
+SQUARE = "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\n"
+
+def parse_text(tmp_path, text):
+    path = tmp_path / "model.obj"
+    path.write_text(text)
+    return parse_obj(str(path))
+
+def test_extra_blanks_between_corners(tmp_path):
+    # One double space per line used to pass for the tag's and get miscounted
+    _, _, _, corners = parse_text(tmp_path, SQUARE + "f  1 2 3\nf 1 3 4\n")
+    assert corners[:, 0].tolist() == [0, 1, 2, 0, 2, 3]
+
+def test_mixed_blanks_and_formats(tmp_path):
+    text = SQUARE + "vt 0 0\nvn 0 0 1\nf 1/1/1\t2/1/1   3/1/1 \nf 1//1  3//1\t\t4//1\r\n"
+    _, _, _, corners = parse_text(tmp_path, text)
+    assert corners.tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0], [0, -1, 0], [2, -1, 0], [3, -1, 0]]
+
+def test_indented_records(tmp_path):
+    plain = parse_text(tmp_path, SQUARE + "f 1 2 3\nf 1 3 4\n")
+    indented = parse_text(tmp_path, "  v 0 0 0\n\tv 1 0 0\nv 1 1 0\n   v 0 1 0\n  f 1 2 3\n\tf 1 3 4\n")
+    for expected, actual in zip(plain, indented):
+        assert np.array_equal(expected, actual)
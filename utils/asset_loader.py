@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+def iter_load(loader, paths, max_workers=None):
+    """Yield (path, loader(path)) for every path as each one finishes, loading them in parallel worker processes.
+
+    loader must be a module-level function so it can be sent to the workers, and
+    must not touch GL: only its (picklable) result comes back to this process.
+    max_workers defaults to one worker per core. With a single path or a single
+    core, or if no worker process can be started, paths load in this process instead.
+    """
+    paths = list(dict.fromkeys(paths))
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    loaded = set()
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(loader, path): path for path in paths}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    result = future.result()
+                    loaded.add(path)
+                    yield path, result
+        except (OSError, BrokenProcessPool):
+            pass
+    for path in paths:
+        if path not in loaded:
+            yield path, loader(path)
+
+def load_all(loader, paths, max_workers=None):
+    """Return {path: loader(path)} for every path; see iter_load."""
+    return dict(iter_load(loader, paths, max_workers))
+
+class BackgroundLoader:
+    """Consume (key, value) pairs from items on a worker thread, storing each in results as it arrives.
+
+    The frame loop keeps running meanwhile: poll progress, and wait for done
+    before using the results. An exception raised by items is re-raised by check().
+    """
+    def __init__(self, items, total, results=None):
+        self.total = total
+        self.loaded = 0
+        self.results = {} if results is None else results
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(items,), daemon=True)
+        self.thread.start()
+
+    def run(self, items):
+        try:
+            for key, value in items:
+                self.results[key] = value
+                self.loaded += 1
+        except Exception as error:
+            self.error = error
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    @property
+    def progress(self):
+        return self.loaded / self.total if self.total else 1.0
+
+    def check(self):
+        if self.error is not None:
+            raise self.error
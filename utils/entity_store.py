@@ -0,0 +1,96 @@
+import numpy as np
+
+class EntityStore:
+    """Structure-of-arrays storage for simulation state, indexed by entity id."""
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.fields = {}
+        self.defaults = {}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Fields shared by every game object
+        self.add_field('position', (3,))
+        self.add_field('velocity', (3,))
+        self.add_field('rotation', (3,))
+        self.add_field('rotation_velocity', (3,))
+        self.add_field('orientation', (3, 3), default=np.identity(3))
+        # Unit quaternion (w, x, y, z) behind orientation; oriented entities draw from it
+        # instead of their Euler rotation
+        self.add_field('quaternion', (4,), dtype=np.float64, default=(1.0, 0.0, 0.0, 0.0))
+        self.add_field('oriented', (), dtype=bool, default=False)
+        self.add_field('radius', ())
+        self.add_field('drag', (), default=1.0)
+
+        # Positions at the start of the current tick, blended with the live ones for drawing
+        self.add_field('tick_start', (3,))
+        self.add_field('render_position', (3,))
+        self.interpolated = False
+
+    def add_field(self, name, shape, dtype=np.float32, default=0):
+        """Register a per-entity array; calling it again with the same name is a no-op."""
+        if name in self.fields:
+            return
+        self.defaults[name] = np.asarray(default, dtype=dtype)
+        array = np.empty((self.capacity,) + shape, dtype=dtype)
+        array[:] = self.defaults[name]
+        self.fields[name] = array
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def allocate(self):
+        if not self.free:
+            self.grow(self.capacity * 2)
+        entity_id = self.free.pop()
+        for name, array in self.fields.items():
+            array[entity_id] = self.defaults[name]
+        self.alive[entity_id] = True
+        return entity_id
+
+    def release(self, entity_id):
+        self.alive[entity_id] = False
+        self.free.append(entity_id)
+
+    def grow(self, capacity):
+        # Existing rows keep their ids; views taken before growing go stale
+        old = self.capacity
+        for name, array in self.fields.items():
+            grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:old] = array
+            grown[old:] = self.defaults[name]
+            self.fields[name] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:old] = self.alive
+        self.alive = alive
+        self.free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def begin_tick(self):
+        """Remember where everything is before a fixed simulation step moves it."""
+        self.fields['tick_start'][:] = self.fields['position']
+        self.interpolated = False
+
+    def interpolate(self, alpha):
+        """Blend tick-start and current positions into render_position (alpha in [0, 1])."""
+        start = self.fields['tick_start']
+        np.multiply(self.fields['position'] - start, alpha, out=self.fields['render_position'])
+        self.fields['render_position'] += start
+        self.interpolated = True
+
+    @property
+    def count(self):
+        return int(self.alive.sum())
+
+class StoreField:
+    """Attribute stored in the owner's EntityStore row instead of on the instance."""
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj.store.fields[self.field][obj.entity_id]
+
+    def __set__(self, obj, value):
+        obj.store.fields[self.field][obj.entity_id] = value
@@ -1,8 +1,18 @@
 import ctypes
+import hashlib
 import numpy as np
 import copy
-from OpenGL.GL import *
-from OpenGL.GL.shaders import compileProgram, compileShader
+try:
+    from OpenGL.GL import *
+    from OpenGL.GL.shaders import compileProgram, compileShader
+except ImportError:
+    # Headless runs simulate without PyOpenGL; GL is only called from rendering code paths
+    pass
+from utils.matrix_utils import TransformBatch
+from utils.mesh_utils import VERTEX_STRIDE
+
+# Uniform buffer binding point shared by the camera and every program using CameraBlock
+CAMERA_BLOCK_BINDING = 0
 
 class VBO:
     def __init__(self, vertices):
@@ -18,6 +28,8 @@ class IBO:
     def __init__(self, indices):
         self.ID = glGenBuffers(1)
         self.count = len(indices)
+        # Welded meshes with few vertices use 16-bit indices
+        self.type = GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
         glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ID)
         glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
     def Use(self):
@@ -39,16 +51,147 @@ class VAO:
     def Delete(self):
         glDeleteVertexArrays(1, (self.vao,))
 
+class Mesh:
+    def __init__(self, vertices, indices, lods=()):
+        self.vbo = VBO(vertices)
+        self.ibo = IBO(indices)
+        self.vao = VAO(self.vbo)
+        self.refCount = 0
+        # Radius of a sphere around the model origin containing every vertex, for culling
+        positions = np.asarray(vertices, dtype=np.float32).reshape(-1, VERTEX_STRIDE)[:, :3]
+        self.boundingRadius = float(np.sqrt((positions ** 2).sum(axis=1).max())) if len(positions) else 0.0
+        # Levels of detail, this mesh first, then simpler versions from (vertices, indices) pairs
+        self.lods = [self] + [Mesh(lod_vertices, lod_indices) for lod_vertices, lod_indices in lods]
+        # Per-instance attribute buffer, created by InstancedRenderer on first use
+        self.instanceVBO = None
+    def Use(self):
+        self.vao.Use()
+        self.ibo.Use()
+    def Delete(self):
+        for lod in self.lods[1:]:
+            lod.Delete()
+        if self.instanceVBO is not None:
+            glDeleteBuffers(1, (self.instanceVBO,))
+        self.vao.Delete()
+        self.ibo.Delete()
+        self.vbo.Delete()
+
+class MeshRegistry:
+    """Process-wide cache of GPU meshes so identical models are uploaded only once."""
+    def __init__(self):
+        self.meshes = {}
+
+    def Acquire(self, key, loader):
+        # loader() is only called on a miss and must return a list of (vertices, indices)
+        # levels of detail, full detail first
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            (vertices, indices), *lods = loader()
+            mesh = Mesh(vertices, indices, lods)
+            self.meshes[key] = mesh
+        mesh.refCount += 1
+        return mesh
+
+    def Release(self, key):
+        mesh = self.meshes.get(key)
+        if mesh is None:
+            return
+        mesh.refCount -= 1
+        if mesh.refCount <= 0:
+            mesh.Delete()
+            del self.meshes[key]
+
+    def Clear(self):
+        for mesh in self.meshes.values():
+            mesh.Delete()
+        self.meshes.clear()
+
 class Shader:
     def __init__(self, vertex_shader, fragment_shader):
         self.ID = compileProgram(compileShader(vertex_shader, GL_VERTEX_SHADER), compileShader(fragment_shader, GL_FRAGMENT_SHADER))
+        self.uniformLocations = {}
+        self.refCount = 0
+
+        # Attach the camera uniform block if this program declares one
+        blockIndex = glGetUniformBlockIndex(self.ID, "CameraBlock")
+        if blockIndex != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.ID, blockIndex, CAMERA_BLOCK_BINDING)
         self.Use()
     def Use(self):
         glUseProgram(self.ID)
     def Delete(self):
-        glDeleteProgram((self.ID,))
+        glDeleteProgram(self.ID)
+
+    def GetUniformLocation(self, name):
+        # Each name is looked up in the driver once; unknown uniforms cache as -1
+        location = self.uniformLocations.get(name)
+        if location is None:
+            location = glGetUniformLocation(self.ID, name.encode('utf-8'))
+            self.uniformLocations[name] = location
+        return location
+
+    # Typed setters, expect the program to be bound with Use()
+    def SetMat4(self, name, matrix, transpose=True):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniformMatrix4fv(location, 1, GL_TRUE if transpose else GL_FALSE, matrix)
+    def SetVec4(self, name, value):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniform4f(location, value[0], value[1], value[2], value[3])
+    def SetVec2(self, name, value):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniform2f(location, value[0], value[1])
+    def SetVec3(self, name, value):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniform3f(location, value[0], value[1], value[2])
+    def SetFloat(self, name, value):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniform1f(location, value)
+    def SetInt(self, name, value):
+        location = self.GetUniformLocation(name)
+        if location != -1:
+            glUniform1i(location, value)
+
+class ShaderRegistry:
+    """Process-wide cache of compiled programs, deduplicated by a hash of their sources."""
+    def __init__(self):
+        self.shaders = {}
+
+    @staticmethod
+    def Key(vertex_shader, fragment_shader):
+        return hashlib.sha1((vertex_shader + "\0" + fragment_shader).encode('utf-8')).hexdigest()
+
+    def Acquire(self, vertex_shader, fragment_shader):
+        key = self.Key(vertex_shader, fragment_shader)
+        shader = self.shaders.get(key)
+        if shader is None:
+            shader = Shader(vertex_shader, fragment_shader)
+            shader.key = key
+            self.shaders[key] = shader
+        shader.refCount += 1
+        return shader
+
+    def Release(self, shader):
+        if self.shaders.get(getattr(shader, "key", None)) is not shader:
+            return
+        shader.refCount -= 1
+        if shader.refCount <= 0:
+            shader.Delete()
+            del self.shaders[shader.key]
+
+    def Clear(self):
+        for shader in self.shaders.values():
+            shader.Delete()
+        self.shaders.clear()
 
 class Camera:
+    # std140 CameraBlock: two mat4 followed by a float, padded to 16 bytes
+    BLOCK_SIZE = 36
+
     def __init__(self, height, width):
         self.height = height
         self.width = width
@@ -65,9 +208,16 @@ class Camera:
 
         self.local_forward = np.array([-1, 0, 0], dtype=np.float32)
 
-    def Update(self, shader):
-        shader.Use()
+        # Matrices are only rebuilt when the inputs they depend on change
+        self.viewMatrix = np.identity(4, dtype=np.float32)
+        self.projectionMatrix = np.identity(4, dtype=np.float32)
+        self.state = None
+        self.block = np.zeros(self.BLOCK_SIZE, dtype=np.float32)
+
+        # Created on the first Update() so a headless game can own a Camera without GL
+        self.ubo = None
 
+    def ComputeMatrices(self):
         # View matrix
 
         viewTranslate = np.array([  [1, 0, 0, -self.position[0]],
@@ -88,7 +238,7 @@ class Camera:
                             [n[0], n[1], n[2],0],
                             [  0,    0,    0, 1]], dtype = np.float32)
 
-        viewMatrix = viewRotate @ viewTranslate
+        self.viewMatrix = viewRotate @ viewTranslate
         
         # Projection matrix
 
@@ -106,80 +256,249 @@ class Camera:
                                 [0, 0, 0, 1]], dtype = np.float32)
 
 
-        projectionMatrix = orthoScale @ orthoTranslate
+        self.projectionMatrix = orthoScale @ orthoTranslate
+
+    def Update(self):
+        """Upload view/projection to the camera uniform block, once per frame at most."""
+        state = np.concatenate((self.position, self.lookAt, self.up,
+                                [self.fov, self.f, self.near, self.far, self.width, self.height])).astype(np.float32)
+        if self.state is not None and np.array_equal(state, self.state):
+            return
+        self.state = state
+
+        self.ComputeMatrices()
+
+        # The block is declared row_major, so NumPy's layout can be copied as is
+        self.block[0:16] = self.viewMatrix.ravel()
+        self.block[16:32] = self.projectionMatrix.ravel()
+        self.block[32] = self.f
+        if self.ubo is None:
+            self.ubo = glGenBuffers(1)
+            glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+            glBufferData(GL_UNIFORM_BUFFER, self.block.nbytes, None, GL_DYNAMIC_DRAW)
+            glBindBufferBase(GL_UNIFORM_BUFFER, CAMERA_BLOCK_BINDING, self.ubo)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, self.block.nbytes, self.block)
 
-        viewMatrixLocation = glGetUniformLocation(shader.ID, "viewMatrix".encode('utf-8'))
-        glUniformMatrix4fv(viewMatrixLocation, 1, GL_TRUE, viewMatrix)
+    def SpheresVisible(self, centers, radii):
+        """Mask of the spheres (world-space centers (N,3), radii (N,)) that reach into the view frustum.
 
-        projectionMatrixLocation = glGetUniformLocation(shader.ID, "projectionMatrix".encode('utf-8'))
-        glUniformMatrix4fv(projectionMatrixLocation, 1, GL_TRUE, projectionMatrix)
+        Uses the matrices of the last Update(). The shaders divide by view depth,
+        so the side planes pass through the eye with slopes tan(fov/2) vertically
+        and that times the aspect ratio horizontally; depth is clipped to [near, far].
+        """
+        view = centers @ self.viewMatrix[:3, :3].T + self.viewMatrix[:3, 3]
+        depth = -view[:, 2]
+        slope_y = np.tan(np.radians(self.fov / 2))
+        slope_x = slope_y * self.width / self.height
+        visible = (depth + radii >= self.near) & (depth - radii <= self.far)
+        visible &= np.abs(view[:, 0]) - depth * slope_x <= radii * np.sqrt(1.0 + slope_x ** 2)
+        visible &= np.abs(view[:, 1]) - depth * slope_y <= radii * np.sqrt(1.0 + slope_y ** 2)
+        return visible
 
-        focalLengthLocation = glGetUniformLocation(shader.ID, "focalLength".encode('utf-8'))
-        glUniform1f(focalLengthLocation, self.f)
+    def ProjectedRadii(self, centers, radii):
+        """Approximate on-screen radius in pixels of each sphere (world-space centers (N,3), radii (N,))."""
+        depth = -(centers @ self.viewMatrix[2, :3] + self.viewMatrix[2, 3])
+        pixels_per_unit = 0.5 * self.height / np.tan(np.radians(self.fov / 2))
+        # The shaders divide by |depth|, so objects behind the camera shrink the same way
+        return radii * pixels_per_unit / np.maximum(np.abs(depth), self.near)
+
+    def Delete(self):
+        if self.ubo is not None:
+            glDeleteBuffers(1, (self.ubo,))
+            self.ubo = None
+
+# Model matrices of every Object live here and are rebuilt together when dirty
+transformBatch = TransformBatch()
 
 class Object:
-    def __init__(self, objType, shader, properties):
+    def __init__(self, objType, shader, properties, mesh=None):
         self.properties = copy.deepcopy(properties)
 
-        self.vbo = VBO(self.properties['vertices'])
-        self.ibo = IBO(self.properties['indices'])
-        self.vao = VAO(self.vbo)
+        # Shared meshes come from a MeshRegistry, otherwise the object owns its buffers
+        self.mesh = mesh
+        if mesh is None:
+            self.vbo = VBO(self.properties['vertices'])
+            self.ibo = IBO(self.properties['indices'])
+            self.vao = VAO(self.vbo)
+        else:
+            self.vbo = mesh.vbo
+            self.ibo = mesh.ibo
+            self.vao = mesh.vao
 
-        self.properties.pop('vertices')
-        self.properties.pop('indices')
+        self.properties.pop('vertices', None)
+        self.properties.pop('indices', None)
+        # Level of detail currently drawn (an index into mesh.lods)
+        self.lod = 0
 
         # Create shaders
         self.shader = shader
 
-    def Draw(self): # Suggestion: Can assosiate new class variable 'self.objType' to write different Draw logic for different types of objects
-        position = self.properties['position']
-        rotation = self.properties['rotation']
-        scale = self.properties['scale']
+        self.transformIndex = transformBatch.allocate()
 
-        translation_matrix = np.array([[1,0,0, position[0]],
-                                    [0,1,0, position[1]],
-                                    [0,0,1, position[2]],
-                                    [0,0,0,1]], dtype = np.float32)
-        
-        rotation_z_matrix = np.array([
-                                    [np.cos(rotation[2]), -np.sin(rotation[2]), 0, 0],
-                                    [np.sin(rotation[2]), np.cos(rotation[2]), 0, 0],
-                                    [0, 0, 1, 0],
-                                    [0, 0, 0, 1]
-                                ], dtype=np.float32)
-        rotation_x_matrix = np.array([
-                                    [1, 0, 0, 0],
-                                    [0, np.cos(rotation[0]), -np.sin(rotation[0]), 0],
-                                    [0, np.sin(rotation[0]), np.cos(rotation[0]), 0],
-                                    [0, 0, 0, 1]
-                                ], dtype=np.float32)
-        rotation_y_matrix = np.array([
-                                    [np.cos(rotation[1]), 0, np.sin(rotation[1]), 0],
-                                    [0, 1, 0, 0],
-                                    [-np.sin(rotation[1]), 0, np.cos(rotation[1]), 0],
-                                    [0, 0, 0, 1]
-                                ], dtype=np.float32)
-
-        scale_matrix = np.array([[scale[0], 0,0,0],
-                                [0,scale[1],0,0],
-                                [0,0,scale[2],0],
-                                [0,0,0,1]], dtype = np.float32)
-        
-        rotationMatrix = rotation_z_matrix @ rotation_y_matrix @ rotation_x_matrix # Roll then pitch then yaw in order (right to left applied)
-        self.modelMatrix = translation_matrix @ rotationMatrix @ scale_matrix
+    def Draw(self): # Suggestion: Can assosiate new class variable 'self.objType' to write different Draw logic for different types of objects
+        self.modelMatrix = self.ComputeModelMatrix()
 
         # Bind the shader, set uniforms, bind vao (automatically binds vbo) and ibo
         self.shader.Use()
-        modelMatrixLocation = glGetUniformLocation(self.shader.ID, "modelMatrix".encode('utf-8'))
-        glUniformMatrix4fv(modelMatrixLocation, 1, GL_TRUE, self.modelMatrix)
-        
-        colourLocation = glGetUniformLocation(self.shader.ID, "objectColour".encode('utf-8'))
-        glUniform4f(colourLocation, self.properties["colour"][0], 
-                    self.properties["colour"][1], 
-                    self.properties["colour"][2], 
-                    self.properties["colour"][3])
+        self.shader.SetMat4("modelMatrix", self.modelMatrix)
+        self.shader.SetVec4("objectColour", self.properties["colour"])
         self.vao.Use()
         self.ibo.Use()
 
         # Issue Draw call with primitive type
-        glDrawElements(GL_TRIANGLES, self.ibo.count, GL_UNSIGNED_INT, None)
\ No newline at end of file
+        glDrawElements(GL_TRIANGLES, self.ibo.count, self.ibo.type, None)
+
+    def SetLod(self, level):
+        """Draw a simpler level of the shared mesh (0 is full detail); clamped to the levels it has."""
+        if self.mesh is None:
+            return
+        self.lod = min(level, len(self.mesh.lods) - 1)
+        lod = self.mesh.lods[self.lod]
+        self.vbo, self.ibo, self.vao = lod.vbo, lod.ibo, lod.vao
+
+    def SyncTransform(self):
+        # Copy the current properties into the shared batch; unchanged rows stay clean.
+        # An 'orientation' matrix, when given, is used instead of the Euler 'rotation'
+        orientation = self.properties.get('orientation')
+        if orientation is None:
+            transformBatch.set(self.transformIndex, self.properties['position'],
+                               self.properties['rotation'], self.properties['scale'])
+        else:
+            transformBatch.set_oriented(self.transformIndex, self.properties['position'],
+                                        orientation, self.properties['scale'])
+
+    def ComputeModelMatrix(self):
+        self.SyncTransform()
+        transformBatch.update()
+        return transformBatch.matrices[self.transformIndex]
+
+    def Delete(self):
+        transformBatch.release(self.transformIndex)
+        # Shared meshes are freed by their registry once the last user releases them
+        if self.mesh is None:
+            self.vao.Delete()
+            self.ibo.Delete()
+            self.vbo.Delete()
+
+class InstancedRenderer:
+    """Collects objects per (mesh, shader) and draws each group with one instanced call."""
+    # Per instance: model matrix as four vec4 columns (locations 2-5), then colour (location 6)
+    INSTANCE_FLOATS = 20
+
+    def __init__(self):
+        self.groups = {}
+        self.drawCalls = 0
+        self.instanceCount = 0
+
+    def Begin(self):
+        self.groups.clear()
+
+    def Submit(self, obj, shader):
+        """Queue a mesh-backed Object to be drawn with an instanced shader."""
+        self.groups.setdefault((obj.mesh.lods[obj.lod], shader), []).append(obj)
+
+    def Draw(self):
+        self.drawCalls = 0
+        self.instanceCount = 0
+
+        # Refresh all submitted transforms first so dirty rows are rebuilt in one pass
+        for objects in self.groups.values():
+            for obj in objects:
+                obj.SyncTransform()
+        transformBatch.update()
+
+        for (mesh, shader), objects in self.groups.items():
+            count = len(objects)
+            data = np.empty((count, self.INSTANCE_FLOATS), dtype=np.float32)
+            models = transformBatch.matrices[[obj.transformIndex for obj in objects]]
+            # GL reads mat4 attributes column by column, so store each matrix transposed
+            data[:, :16] = models.transpose(0, 2, 1).reshape(count, 16)
+            data[:, 16:] = [obj.properties['colour'] for obj in objects]
+
+            self.UploadInstances(mesh, data)
+            shader.Use()
+            mesh.Use()
+            glDrawElementsInstanced(GL_TRIANGLES, mesh.ibo.count, mesh.ibo.type, None, count)
+
+            self.drawCalls += 1
+            self.instanceCount += count
+
+    def UploadInstances(self, mesh, data):
+        if mesh.instanceVBO is None:
+            mesh.instanceVBO = glGenBuffers(1)
+            mesh.vao.Use()
+            glBindBuffer(GL_ARRAY_BUFFER, mesh.instanceVBO)
+            stride = self.INSTANCE_FLOATS * ctypes.sizeof(ctypes.c_float)
+            for column in range(5):
+                location = 2 + column
+                glEnableVertexAttribArray(location)
+                glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(column * 4 * ctypes.sizeof(ctypes.c_float)))
+                glVertexAttribDivisor(location, 1)
+        glBindBuffer(GL_ARRAY_BUFFER, mesh.instanceVBO)
+        # Re-specifying the whole store each frame lets the driver orphan the old one
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+
+class OverlayBatch:
+    """Screen-space triangles with a colour per vertex, drawn over the scene in one call.
+
+    Vertices are (N, 6) float32 rows of x, y (pixels from the top-left corner)
+    and r, g, b, a. They are drawn alpha blended and without depth testing.
+    """
+    FLOATS = 6
+
+    def __init__(self, shader):
+        self.shader = shader
+        self.vao = glGenVertexArrays(1)
+        self.vbo = glGenBuffers(1)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        stride = self.FLOATS * ctypes.sizeof(ctypes.c_float)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(1)
+        glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(2 * ctypes.sizeof(ctypes.c_float)))
+
+    def Draw(self, vertices, width, height):
+        if len(vertices) == 0:
+            return
+        self.shader.Use()
+        self.shader.SetVec2("screenSize", (width, height))
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        # The overlay's vertex count changes from frame to frame, so size the buffer to fit
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDrawArrays(GL_TRIANGLES, 0, len(vertices))
+        glDisable(GL_BLEND)
+        glEnable(GL_DEPTH_TEST)
+
+    def Delete(self):
+        glDeleteVertexArrays(1, (self.vao,))
+        glDeleteBuffers(1, (self.vbo,))
+
+class FullScreenPass:
+    """Runs a fragment shader over the whole frame, alpha blended over what is already drawn.
+
+    The vertex shader makes one screen-covering triangle from gl_VertexID, so no
+    vertex buffer is needed. Set the uniforms on self.shader (after Use()) before Draw().
+    """
+    def __init__(self, shader):
+        self.shader = shader
+        # Core profiles still need a vertex array bound to draw
+        self.vao = glGenVertexArrays(1)
+
+    def Draw(self):
+        self.shader.Use()
+        glBindVertexArray(self.vao)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDrawArrays(GL_TRIANGLES, 0, 3)
+        glDisable(GL_BLEND)
+        glEnable(GL_DEPTH_TEST)
+
+    def Delete(self):
+        glDeleteVertexArrays(1, (self.vao,))
@@ -0,0 +1,163 @@
+import math
+import numpy as np
+from contextlib import nullcontext
+try:
+    import imgui
+    from OpenGL.GL import *
+except ImportError:
+    # Headless games never draw the HUD
+    imgui = None
+
+class Hud:
+    """Draws every imgui widget of a frame inside one imgui frame.
+
+    Widgets register a draw callback once. Draw() opens a single frame, runs the
+    callbacks in registration order (each decides for itself whether it has
+    anything to show) and renders the combined draw data with one upload.
+    Callbacks must not call imgui.new_frame() or imgui.render() themselves.
+    """
+    def __init__(self, gui):
+        self.gui = gui
+        self.callbacks = {}
+
+    def Register(self, name, callback):
+        self.callbacks[name] = callback
+
+    def Unregister(self, name):
+        self.callbacks.pop(name, None)
+
+    def Draw(self, profiler=None):
+        imgui.new_frame()
+        for name, callback in self.callbacks.items():
+            # Each widget is still timed on its own
+            with profiler.phase(name) if profiler is not None else nullcontext():
+                callback()
+        imgui.render()
+        self.gui.render(imgui.get_draw_data())
+
+# Index of the colour argument of the draw-list calls DrawCommands can recolour
+COLOUR_ARGUMENT = {
+    "add_line": 4,
+    "add_rect": 4,
+    "add_rect_filled": 4,
+    "add_circle": 3,
+    "add_circle_filled": 3,
+    "add_text": 2,
+}
+
+class DrawCommands:
+    """Draw-list calls recorded once and replayed every frame, for HUD parts that only change with the layout.
+
+    Stands in for an imgui draw list while recording: any add_* call is stored
+    with its arguments (colours already packed), and Replay() issues them all
+    on the frame's real draw list.
+    """
+    def __init__(self):
+        self.commands = []
+
+    def __getattr__(self, name):
+        if not name.startswith("add_"):
+            raise AttributeError(name)
+        def record(*args):
+            self.commands.append((name, args))
+        return record
+
+    def Replay(self, draw_list):
+        for name, args in self.commands:
+            getattr(draw_list, name)(*args)
+
+    def Recoloured(self, colour):
+        """Copy with colour(packed) applied to the colour of every call."""
+        copy = DrawCommands()
+        for name, args in self.commands:
+            args = list(args)
+            args[COLOUR_ARGUMENT[name]] = colour(args[COLOUR_ARGUMENT[name]])
+            copy.commands.append((name, tuple(args)))
+        return copy
+
+    def Delete(self):
+        pass
+
+class BakedDrawCommands:
+    """DrawCommands rasterized once into a texture and drawn every frame as one image.
+
+    Replaying commands still makes imgui tessellate every shape each frame; a
+    baked layer is a single textured quad. The commands are rendered by the
+    game's imgui renderer (gui) into an offscreen framebuffer, in a throwaway
+    imgui context sharing the game's fonts, and the bounds (x0, y0, x1, y1)
+    are read back into the texture.
+    """
+    def __init__(self, commands, gui, bounds):
+        x0, y0 = math.floor(bounds[0]), math.floor(bounds[1])
+        x1, y1 = math.ceil(bounds[2]), math.ceil(bounds[3])
+        self.rect = ((x0, y0), (x1, y1))
+        io = imgui.get_io()
+        scale_x, scale_y = io.display_fb_scale
+        region = (round(x0 * scale_x), round(y0 * scale_y), round((x1 - x0) * scale_x), round((y1 - y0) * scale_y))
+
+        # imgui blends every channel with (SRC_ALPHA, ONE_MINUS_SRC_ALPHA), so over a
+        # transparent target the colour comes out premultiplied but the alpha doesn't.
+        # The coverage is the colour of a second pass with everything drawn in white.
+        premultiplied = self.Rasterize(commands, gui, region)
+        coverage = self.Rasterize(commands.Recoloured(lambda colour: colour | 0x00FFFFFF), gui, region)[..., :1]
+        pixels = np.concatenate([premultiplied[..., :3] / np.maximum(coverage, 1.0 / 255.0), coverage], axis=-1)
+        image = np.round(np.clip(pixels, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+        self.texture = int(glGenTextures(1))
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, region[2], region[3], 0, GL_RGBA, GL_UNSIGNED_BYTE,
+                     np.ascontiguousarray(image))
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    @staticmethod
+    def Rasterize(commands, gui, region):
+        """Render commands offscreen; returns the (x, y, width, height) framebuffer region as floats, top row first."""
+        io = imgui.get_io()
+        display_size = io.display_size
+        # The renderer projects with the game's display size, so the target matches the screen
+        width = round(display_size[0] * io.display_fb_scale[0])
+        height = round(display_size[1] * io.display_fb_scale[1])
+        target = int(glGenTextures(1))
+        glBindTexture(GL_TEXTURE_2D, target)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        framebuffer = int(glGenFramebuffers(1))
+        previous_framebuffer = int(glGetIntegerv(GL_FRAMEBUFFER_BINDING))
+        glBindFramebuffer(GL_FRAMEBUFFER, framebuffer)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, target, 0)
+        clear_colour = glGetFloatv(GL_COLOR_CLEAR_VALUE)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glClearColor(*clear_colour)
+
+        # A separate context, so the game's frame in progress is left alone
+        game_context = imgui.get_current_context()
+        context = imgui.create_context(io.fonts)
+        imgui.set_current_context(context)
+        try:
+            imgui.get_io().display_size = display_size
+            imgui.new_frame()
+            commands.Replay(imgui.get_background_draw_list())
+            imgui.render()
+            gui.render(imgui.get_draw_data())
+        finally:
+            imgui.set_current_context(game_context)
+            imgui.destroy_context(context)
+
+        # GL rows run bottom-up
+        x, y, region_width, region_height = region
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(x, height - y - region_height, region_width, region_height, GL_RGBA, GL_UNSIGNED_BYTE)
+        glBindFramebuffer(GL_FRAMEBUFFER, previous_framebuffer)
+        glDeleteFramebuffers(1, [framebuffer])
+        glDeleteTextures(1, [target])
+        pixels = np.frombuffer(bytes(pixels), dtype=np.uint8).reshape(region_height, region_width, 4)[::-1]
+        return pixels.astype(np.float32) / 255.0
+
+    def Replay(self, draw_list):
+        draw_list.add_image(self.texture, *self.rect)
+
+    def Delete(self):
+        glDeleteTextures(1, [self.texture])
@@ -36,3 +36,239 @@ def matrix_to_euler(R):
         yaw = np.arctan2(R[1,0]/np.cos(pitch), R[0,0]/np.cos(pitch))
         
     return np.array([roll, pitch, yaw], dtype=np.float32)
+
+# Quaternions are stored as (w, x, y, z) in the last axis, so the functions
+# below work on a single (4,) orientation or on (N,4) rows of the entity store.
+# Products are written as matmuls with constant tensors, which costs a few numpy
+# calls whether there is one quaternion or thousands.
+
+def _product_tensor():
+    # (a * b)[j] = sum over i, k of a[i] * b[k] * tensor[i, j, k]
+    tensor = np.zeros((4, 4, 4))
+    for i, k, j, sign in ((0, 0, 0, 1), (1, 1, 0, -1), (2, 2, 0, -1), (3, 3, 0, -1),
+                          (0, 1, 1, 1), (1, 0, 1, 1), (2, 3, 1, 1), (3, 2, 1, -1),
+                          (0, 2, 2, 1), (1, 3, 2, -1), (2, 0, 2, 1), (3, 1, 2, 1),
+                          (0, 3, 3, 1), (1, 2, 3, 1), (2, 1, 3, -1), (3, 0, 3, 1)):
+        tensor[i, j, k] = sign
+    return tensor.reshape(4, 16)
+
+def _matrix_tensor():
+    # Row-major rotation matrix entries as quadratic forms of a unit quaternion
+    # (the 1 in e.g. 1 - 2(y^2 + z^2) is written as w^2 + x^2 + y^2 + z^2)
+    w, x, y, z = range(4)
+    terms = (
+        ((w, w, 1), (x, x, 1), (y, y, -1), (z, z, -1)), ((x, y, 2), (w, z, -2)), ((x, z, 2), (w, y, 2)),
+        ((x, y, 2), (w, z, 2)), ((w, w, 1), (x, x, -1), (y, y, 1), (z, z, -1)), ((y, z, 2), (w, x, -2)),
+        ((x, z, 2), (w, y, -2)), ((y, z, 2), (w, x, 2)), ((w, w, 1), (x, x, -1), (y, y, -1), (z, z, 1)),
+    )
+    tensor = np.zeros((4, 4, 9))
+    for entry, products in enumerate(terms):
+        for i, k, weight in products:
+            tensor[i, k, entry] += weight
+    return tensor.reshape(16, 9)
+
+QUATERNION_PRODUCT = _product_tensor()
+QUATERNION_MATRIX = _matrix_tensor()
+
+def quaternion_multiply(a, b):
+    """Hamilton product a * b (rotate by b in a's local frame, like a @ b for matrices)."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    left = (a @ QUATERNION_PRODUCT).reshape(a.shape[:-1] + (4, 4))
+    return (left @ b[..., np.newaxis])[..., 0]
+
+def _euler_tensor():
+    # Coefficients of qz * qy * qx in the products (cz|sz)(cy|sy)(cx|sx) of half-angle terms
+    tensor = np.zeros((2, 2, 2, 4))
+    for z in range(2):
+        for y in range(2):
+            for x in range(2):
+                qz = np.array([1.0, 0.0, 0.0, 0.0]) if z == 0 else np.array([0.0, 0.0, 0.0, 1.0])
+                qy = np.array([1.0, 0.0, 0.0, 0.0]) if y == 0 else np.array([0.0, 0.0, 1.0, 0.0])
+                qx = np.array([1.0, 0.0, 0.0, 0.0]) if x == 0 else np.array([0.0, 1.0, 0.0, 0.0])
+                tensor[z, y, x] = quaternion_multiply(quaternion_multiply(qz, qy), qx)
+    return tensor.reshape(8, 4)
+
+QUATERNION_EULER = _euler_tensor()
+
+def euler_to_quaternion(euler):
+    """Quaternion of Euler angles (in radians), the same rotation as rotation_matrix (ZYX order)."""
+    half = np.asarray(euler, dtype=np.float64) * 0.5
+    # (..., axis, cos|sin) half-angle terms
+    terms = np.stack([np.cos(half), np.sin(half)], axis=-1)
+    zy = (terms[..., 2, :, np.newaxis] * terms[..., 1, np.newaxis, :]).reshape(half.shape[:-1] + (4,))
+    zyx = (zy[..., :, np.newaxis] * terms[..., 0, np.newaxis, :]).reshape(half.shape[:-1] + (8,))
+    return zyx @ QUATERNION_EULER
+
+def renormalize_quaternion(q):
+    """Pull a quaternion that drifted slightly off unit length back onto it.
+
+    One Newton step of 1/sqrt(|q|^2), so no square root or division; plenty
+    for the rounding error a single rotation step adds.
+    """
+    q = np.asarray(q, dtype=np.float64)
+    return q * (1.5 - 0.5 * (q[..., np.newaxis, :] @ q[..., np.newaxis])[..., 0])
+
+def rotate_quaternion(q, euler_step):
+    """Apply a small local-frame rotation given as Euler angles, renormalized."""
+    return renormalize_quaternion(quaternion_multiply(q, euler_to_quaternion(euler_step)))
+
+def quaternion_to_matrix(q):
+    """Rotation matrices of unit quaternions: (4,) -> (3,3) or (N,4) -> (N,3,3)."""
+    q = np.asarray(q, dtype=np.float64)
+    outer = (q[..., :, np.newaxis] * q[..., np.newaxis, :]).reshape(q.shape[:-1] + (16,))
+    return (outer @ QUATERNION_MATRIX).reshape(q.shape[:-1] + (3, 3)).astype(np.float32)
+
+def matrix_to_quaternion(R):
+    """Unit quaternion of a 3x3 rotation matrix."""
+    R = np.asarray(R, dtype=np.float64)
+    trace = R[0, 0] + R[1, 1] + R[2, 2]
+    # Divide by the largest of the four candidates to stay accurate near 180 degree turns
+    if trace > 0:
+        s = 2.0 * np.sqrt(1.0 + trace)
+        q = [0.25 * s, (R[2, 1] - R[1, 2]) / s, (R[0, 2] - R[2, 0]) / s, (R[1, 0] - R[0, 1]) / s]
+    elif R[0, 0] > R[1, 1] and R[0, 0] > R[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + R[0, 0] - R[1, 1] - R[2, 2])
+        q = [(R[2, 1] - R[1, 2]) / s, 0.25 * s, (R[0, 1] + R[1, 0]) / s, (R[0, 2] + R[2, 0]) / s]
+    elif R[1, 1] > R[2, 2]:
+        s = 2.0 * np.sqrt(1.0 + R[1, 1] - R[0, 0] - R[2, 2])
+        q = [(R[0, 2] - R[2, 0]) / s, (R[0, 1] + R[1, 0]) / s, 0.25 * s, (R[1, 2] + R[2, 1]) / s]
+    else:
+        s = 2.0 * np.sqrt(1.0 + R[2, 2] - R[0, 0] - R[1, 1])
+        q = [(R[1, 0] - R[0, 1]) / s, (R[0, 2] + R[2, 0]) / s, (R[1, 2] + R[2, 1]) / s, 0.25 * s]
+    q = np.array(q)
+    return q / np.linalg.norm(q)
+
+def model_matrices(positions, rotations, scales):
+    """Build (N,4,4) model matrices T @ Rz @ Ry @ Rx @ S for N objects in one pass."""
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    rotations = np.asarray(rotations, dtype=np.float64).reshape(-1, 3)
+    scales = np.asarray(scales, dtype=np.float64).reshape(-1, 3)
+
+    cx, cy, cz = np.cos(rotations).T
+    sx, sy, sz = np.sin(rotations).T
+
+    matrices = np.zeros((len(positions), 4, 4), dtype=np.float32)
+    # Rotation part of Rz @ Ry @ Rx, expanded per element
+    matrices[:, 0, 0] = cz * cy
+    matrices[:, 0, 1] = cz * sy * sx - sz * cx
+    matrices[:, 0, 2] = cz * sy * cx + sz * sx
+    matrices[:, 1, 0] = sz * cy
+    matrices[:, 1, 1] = sz * sy * sx + cz * cx
+    matrices[:, 1, 2] = sz * sy * cx - cz * sx
+    matrices[:, 2, 0] = -sy
+    matrices[:, 2, 1] = cy * sx
+    matrices[:, 2, 2] = cy * cx
+    # Scaling on the right multiplies each column
+    matrices[:, :3, :3] *= scales[:, np.newaxis, :]
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+def compose_matrices(positions, rotations, scales):
+    """Build (N,4,4) model matrices T @ R @ S for N objects from (N,3,3) rotation matrices."""
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    rotations = np.asarray(rotations, dtype=np.float64).reshape(-1, 3, 3)
+    scales = np.asarray(scales, dtype=np.float64).reshape(-1, 3)
+
+    matrices = np.zeros((len(positions), 4, 4), dtype=np.float32)
+    matrices[:, :3, :3] = rotations * scales[:, np.newaxis, :]
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+class TransformBatch:
+    """Contiguous position/rotation/scale storage with model matrices rebuilt only for dirty rows.
+
+    A row's rotation is either Euler angles (set) or a 3x3 matrix (set_oriented),
+    e.g. from an object's quaternion; oriented rows skip the Euler trigonometry.
+    """
+    def __init__(self, capacity=256):
+        # Each row holds position (0:3), Euler rotation (3:6) and scale (6:9)
+        self.params = np.zeros((capacity, 9), dtype=np.float64)
+        self.params[:, 6:9] = 1.0
+        # Rotation matrices of the rows marked oriented
+        self.orientations = np.tile(np.identity(3), (capacity, 1, 1))
+        self.oriented = np.zeros(capacity, dtype=bool)
+        self.matrices = np.tile(np.identity(4, dtype=np.float32), (capacity, 1, 1))
+        self.dirty = np.zeros(capacity, dtype=bool)
+        self.any_dirty = False
+        self.free = list(range(capacity - 1, -1, -1))
+        self.scratch = np.zeros(9, dtype=np.float64)
+
+    @property
+    def capacity(self):
+        return len(self.params)
+
+    def allocate(self):
+        if not self.free:
+            self.grow(self.capacity * 2)
+        index = self.free.pop()
+        self.params[index] = 0.0
+        self.params[index, 6:9] = 1.0
+        self.matrices[index] = np.identity(4, dtype=np.float32)
+        self.oriented[index] = False
+        self.dirty[index] = False
+        return index
+
+    def release(self, index):
+        self.dirty[index] = False
+        self.free.append(index)
+
+    def grow(self, capacity):
+        old = self.capacity
+        params = np.zeros((capacity, 9), dtype=np.float64)
+        params[:, 6:9] = 1.0
+        params[:old] = self.params
+        matrices = np.tile(np.identity(4, dtype=np.float32), (capacity, 1, 1))
+        matrices[:old] = self.matrices
+        orientations = np.tile(np.identity(3), (capacity, 1, 1))
+        orientations[:old] = self.orientations
+        oriented = np.zeros(capacity, dtype=bool)
+        oriented[:old] = self.oriented
+        dirty = np.zeros(capacity, dtype=bool)
+        dirty[:old] = self.dirty
+        self.params, self.matrices, self.dirty = params, matrices, dirty
+        self.orientations, self.oriented = orientations, oriented
+        self.free.extend(range(capacity - 1, old - 1, -1))
+
+    def set(self, index, position, rotation, scale):
+        """Store a row's transform, marking it dirty only if something changed."""
+        new = self.scratch
+        new[0:3] = position
+        new[3:6] = rotation
+        new[6:9] = scale
+        if self.oriented[index] or not np.array_equal(new, self.params[index]):
+            self.params[index] = new
+            self.oriented[index] = False
+            self.dirty[index] = True
+            self.any_dirty = True
+
+    def set_oriented(self, index, position, orientation, scale):
+        """Store a row's transform with its rotation given as a 3x3 matrix."""
+        new = self.scratch
+        new[0:3] = position
+        new[3:6] = 0.0
+        new[6:9] = scale
+        if (not self.oriented[index] or not np.array_equal(new, self.params[index])
+                or not np.array_equal(orientation, self.orientations[index])):
+            self.params[index] = new
+            self.orientations[index] = orientation
+            self.oriented[index] = True
+            self.dirty[index] = True
+            self.any_dirty = True
+
+    def update(self):
+        """Recompute the model matrices of every dirty row in one vectorized pass."""
+        if not self.any_dirty:
+            return
+        rows = np.flatnonzero(self.dirty)
+        oriented = self.oriented[rows]
+        euler_rows, oriented_rows = rows[~oriented], rows[oriented]
+        if len(euler_rows):
+            params = self.params[euler_rows]
+            self.matrices[euler_rows] = model_matrices(params[:, 0:3], params[:, 3:6], params[:, 6:9])
+        if len(oriented_rows):
+            params = self.params[oriented_rows]
+            self.matrices[oriented_rows] = compose_matrices(params[:, 0:3], self.orientations[oriented_rows], params[:, 6:9])
+        self.dirty[rows] = False
+        self.any_dirty = False
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import numpy as np
+
+def cache_path(source_path):
+    """Binary cache file kept next to a model, e.g. pirate.obj -> pirate.mesh.npz."""
+    return os.path.splitext(source_path)[0] + ".mesh.npz"
+
+def source_stamp(source_path):
+    stat = os.stat(source_path)
+    return np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+def source_hash(source_path):
+    with open(source_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def write_cache(path, version, stamp, digest, levels):
+    # Write to a temporary file first so a crash never leaves a truncated cache behind
+    temp_path = path + ".tmp.npz"
+    arrays = {}
+    for level, (vertices, indices) in enumerate(levels):
+        arrays[f"vertices_{level}"] = vertices
+        arrays[f"indices_{level}"] = indices
+    try:
+        np.savez(temp_path, version=np.int64(version), stamp=stamp, hash=np.array(digest),
+                 levels=np.int64(len(levels)), **arrays)
+        os.replace(temp_path, path)
+    except OSError:
+        # A read-only asset directory just means no cache
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def cache_is_current(source_path, version):
+    """Whether load_cached_mesh would return the cache without rebuilding or hashing the source."""
+    try:
+        with np.load(cache_path(source_path)) as cached:
+            return int(cached['version']) == version and np.array_equal(cached['stamp'], source_stamp(source_path))
+    except (OSError, KeyError, ValueError):
+        return False
+
+def read_levels(cached):
+    return [(cached[f"vertices_{level}"], cached[f"indices_{level}"]) for level in range(int(cached['levels']))]
+
+def load_cached_mesh(source_path, build, version):
+    """Return the list of (vertices, indices) levels of a model, from its binary cache when current.
+
+    build(source_path) produces the levels when the cache is missing or stale.
+    The cache is checked by source mtime and size first. If those changed, the
+    content hash decides (a fresh checkout touches every file). version must be
+    bumped whenever build() starts producing different arrays.
+    """
+    path = cache_path(source_path)
+    stamp = source_stamp(source_path)
+    try:
+        with np.load(path) as cached:
+            if int(cached['version']) == version:
+                levels = read_levels(cached)
+                if np.array_equal(cached['stamp'], stamp):
+                    return levels
+                digest = source_hash(source_path)
+                if str(cached['hash']) == digest:
+                    write_cache(path, version, stamp, digest, levels)
+                    return levels
+    except (OSError, KeyError, ValueError):
+        pass
+
+    levels = build(source_path)
+    write_cache(path, version, stamp, source_hash(source_path), levels)
+    return levels
@@ -0,0 +1,201 @@
+import re
+import numpy as np
+
+# Interleaved vertex layout used by every mesh: position (3) + normal (3)
+VERTEX_STRIDE = 6
+
+def compact_indices(indices, vertex_count):
+    """Store indices as uint16 when every vertex is addressable with 16 bits."""
+    dtype = np.uint16 if vertex_count <= np.iinfo(np.uint16).max + 1 else np.uint32
+    return np.ascontiguousarray(indices, dtype=dtype)
+
+def weld_vertices(vertices, indices, stride=VERTEX_STRIDE):
+    """Merge identical interleaved vertices and rewrite the indices to match.
+
+    Welded vertices are numbered in the order the index buffer first uses them,
+    so the vertex fetches of consecutive triangles stay close together.
+    """
+    rows = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, stride)
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # np.unique numbers vertices in sorted order; renumber them by first use instead
+    # (vertices no triangle references are dropped)
+    used = inverse[np.asarray(indices).reshape(-1)]
+    referenced, first_use = np.unique(used, return_index=True)
+    order = referenced[np.argsort(first_use)]
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+
+    welded = rows[first[order]].reshape(-1)
+    return welded, compact_indices(rank[used], len(order))
+
+def mesh_memory(vertices, indices):
+    """Bytes a mesh takes on the GPU (vertex plus index buffer)."""
+    return vertices.nbytes + indices.nbytes
+
+SPACE, TAB, NEWLINE, HASH = b' \t\n#'
+# Bytes bytes.split() treats as whitespace
+BLANKS = np.frombuffer(b' \t\n\r\x0b\x0c', dtype=np.uint8)
+OBJ_TAGS = (b'v', b'vt', b'vn', b'f')
+
+def obj_records(data):
+    """Collect the v, vt, vn and f records of an OBJ file into one block of text per tag.
+
+    Returns {tag: (text, count)}. Lines are classified with array operations,
+    their tags and comments are blanked out in place, and each run of equally
+    tagged lines (writers emit them in long runs) is copied out in one slice, so
+    no Python code runs per line. Every record keeps its terminating newline.
+    Leading spaces and tabs before a tag are ignored, as by line.strip().
+    """
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    buffer = np.frombuffer(bytearray(data + b'\0\0'), dtype=np.uint8)
+    newline = np.flatnonzero(buffer[:len(data)] == NEWLINE)
+    line_start = np.concatenate(([0], newline[:-1] + 1))
+    line_end = newline + 1
+    # Tags are read from each line's first non-blank byte (the newline itself on a blank line)
+    non_blank = np.flatnonzero((buffer[:len(data)] != SPACE) & (buffer[:len(data)] != TAB))
+    tag_start = non_blank[np.searchsorted(non_blank, line_start)]
+
+    first, second, third = buffer[tag_start], buffer[tag_start + 1], buffer[tag_start + 2]
+    blank_second = (second == SPACE) | (second == TAB)
+    blank_third = (third == SPACE) | (third == TAB)
+    kind = np.zeros(len(line_start), dtype=np.int8)
+    kind[(first == ord('v')) & blank_second] = 1
+    kind[(first == ord('v')) & (second == ord('t')) & blank_third] = 2
+    kind[(first == ord('v')) & (second == ord('n')) & blank_third] = 3
+    kind[(first == ord('f')) & blank_second] = 4
+
+    # Blank the tags, and any comment trailing a record, so only numbers remain
+    buffer[tag_start[kind > 0]] = SPACE
+    buffer[tag_start[(kind == 2) | (kind == 3)] + 1] = SPACE
+    for hash_at in np.flatnonzero(buffer[:len(data)] == HASH).tolist():
+        line = np.searchsorted(line_start, hash_at, side='right') - 1
+        if kind[line] > 0:
+            buffer[hash_at:line_end[line] - 1] = SPACE
+
+    run_start = np.flatnonzero(np.diff(kind, prepend=np.int8(-1)))
+    run_end = np.append(run_start[1:], len(kind))
+    blocks = {tag: [] for tag in OBJ_TAGS}
+    for start, end in zip(run_start.tolist(), run_end.tolist()):
+        if kind[start] > 0:
+            blocks[OBJ_TAGS[kind[start] - 1]].append(buffer[line_start[start]:line_end[end - 1]].tobytes())
+    counts = np.bincount(kind, minlength=len(OBJ_TAGS) + 1)
+    return {tag: (b''.join(blocks[tag]), int(counts[i + 1])) for i, tag in enumerate(OBJ_TAGS)}
+
+def parse_floats(text, count, width):
+    """Parse count records, one per line, into a (count, width) float32 array."""
+    if not count:
+        return np.zeros((0, width), dtype=np.float32)
+    values = np.fromstring(text, dtype=np.float32, sep=' ')
+    if len(values) == count * width:
+        return values.reshape(-1, width)
+    # Some records carry extra components (e.g. vertex colours); keep the first width
+    return np.array([line.split()[:width] for line in text.splitlines()], dtype=np.float32)
+
+# Face corner formats, keyed by (slashes, double slashes) per corner, and the
+# (position, texcoord, normal) columns each fills. Only 'v/t' can be faked by a
+# mix of other formats, so it is confirmed with its regex.
+CORNER_FORMATS = {
+    (0, 0): (None, [0]),
+    (1, 0): (rb'-?\d+/-?\d+', [0, 1]),
+    (2, 1): (None, [0, 2]),
+    (2, 0): (None, [0, 1, 2]),
+}
+
+def parse_faces(text, faces):
+    """Parse face records (one per line) into corner counts and a (corners, 3) array of 1-based indices (0 = missing)."""
+    # A corner starts at every non-blank byte after a blank one, so each line's
+    # count matches len(line.split()) however the corners are spaced
+    buffer = np.frombuffer(text, dtype=np.uint8)
+    blank = np.isin(buffer, BLANKS)
+    corner_start = np.flatnonzero(~blank & np.concatenate(([True], blank[:-1])))
+    counts = np.diff(np.searchsorted(corner_start, np.flatnonzero(buffer == NEWLINE)), prepend=0)
+    tokens = len(corner_start)
+    corners = np.zeros((tokens, 3), dtype=np.int64)
+    if not tokens:
+        return counts, corners
+
+    # Files normally use one corner format throughout, which parses in bulk
+    slashes, doubles = text.count(b'/'), text.count(b'//')
+    if slashes % tokens == 0 and doubles % tokens == 0:
+        pattern, columns = CORNER_FORMATS.get((slashes // tokens, doubles // tokens), (None, None))
+        if columns is not None and (pattern is None or re.fullmatch(rb'(?:\s*' + pattern + rb')*\s*', text)):
+            values = np.fromstring(text.replace(b'/', b' '), dtype=np.int64, sep=' ')
+            if len(values) == tokens * len(columns):
+                corners[:, columns] = values.reshape(tokens, len(columns))
+                return counts, corners
+
+    # Mixed corner formats: parse each corner on its own
+    for i, token in enumerate(text.split()):
+        for j, field in enumerate(token.split(b'/')[:3]):
+            if field:
+                corners[i, j] = int(field)
+    return counts, corners
+
+def fan_triangles(counts):
+    """Corner offsets triangulating polygons with counts[i] corners as fans (0, k, k + 1)."""
+    counts = np.asarray(counts, dtype=np.intp)
+    triangles = np.maximum(counts - 2, 0)
+    face_start = np.cumsum(counts) - counts
+    start = np.repeat(face_start, triangles)
+    k = np.arange(int(triangles.sum())) - np.repeat(np.cumsum(triangles) - triangles, triangles) + 1
+    return np.stack([start, start + k, start + k + 1], axis=1)
+
+def parse_obj(file_path):
+    """Read an OBJ file with bulk text and array operations instead of a per-line loop.
+
+    Returns positions (V,3), normals (N,3) and texture coordinates (T,2) as
+    float32 arrays, plus a (3 * triangles, 3) array of zero-based
+    (position, texcoord, normal) indices per triangle corner, -1 where a corner
+    has no texcoord or normal. Quads and larger polygons are fan triangulated.
+    Negative indices count back from the end of the file's v/vt/vn lists.
+    """
+    with open(file_path, 'rb') as f:
+        records = obj_records(f.read())
+
+    positions = parse_floats(*records[b'v'], 3)
+    texture_coords = parse_floats(*records[b'vt'], 2)
+    normals = parse_floats(*records[b'vn'], 3)
+    counts, corners = parse_faces(*records[b'f'])
+
+    # 1-based -> 0-based, relative (negative) indices from the end, missing -> -1
+    corners -= 1
+    negative = corners < -1
+    if negative.any():
+        sizes = np.array([len(positions), len(texture_coords), len(normals)], dtype=np.int64)
+        corners = np.where(negative, corners + 1 + sizes, corners)
+    return positions, normals, texture_coords, corners[fan_triangles(counts).reshape(-1)]
+
+def decimate(vertices, indices, cells, stride=VERTEX_STRIDE):
+    """Simplify a mesh by vertex clustering.
+
+    The bounding box is cut into cells**3 grid cells and all vertices in a cell
+    merge into one, at their mean position with their summed normal. Triangles
+    left with two corners in the same cell, or repeating another triangle, are
+    dropped. Returns welded (vertices, indices) like weld_vertices.
+    """
+    rows = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, stride)
+    positions = rows[:, :3]
+    low = positions.min(axis=0)
+    extent = np.maximum(positions.max(axis=0) - low, 1e-6)
+    cell = np.minimum(((positions - low) / extent * cells).astype(np.int64), cells - 1)
+    _, cluster = np.unique((cell[:, 0] * cells + cell[:, 1]) * cells + cell[:, 2], return_inverse=True)
+    cluster = cluster.reshape(-1)
+
+    count = np.bincount(cluster)
+    merged = np.stack([np.bincount(cluster, weights=rows[:, column]) for column in range(stride)], axis=1)
+    merged[:, :3] /= count[:, None]
+    length = np.linalg.norm(merged[:, 3:6], axis=1, keepdims=True)
+    merged[:, 3:6] = np.where(length > 1e-6, merged[:, 3:6] / np.maximum(length, 1e-6), [0.0, 0.0, 1.0])
+
+    triangles = cluster[np.asarray(indices).reshape(-1, 3)]
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) &
+                          (triangles[:, 2] != triangles[:, 0])]
+    # Rotate each triangle to start at its smallest index (keeping the winding) so repeats compare equal
+    first = np.argmin(triangles, axis=1)
+    triangles = triangles[np.arange(len(triangles))[:, None], (first[:, None] + np.arange(3)) % 3]
+    _, keep = np.unique(triangles, axis=0, return_index=True)
+    triangles = triangles[np.sort(keep)]
+    return weld_vertices(merged.astype(np.float32).reshape(-1), triangles.reshape(-1), stride)
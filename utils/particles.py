@@ -0,0 +1,87 @@
+import numpy as np
+
+class SpeedLines:
+    """Screen-space speed streaks kept as parallel NumPy arrays and updated in vectorized passes.
+
+    Random values come from np.random, so seeding it makes the effect repeatable.
+    """
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.length = np.zeros(capacity, dtype=np.float32)
+        self.angle = np.zeros(capacity, dtype=np.float32)
+        self.alpha = np.zeros(capacity, dtype=np.float32)
+
+    def reserve(self, count):
+        capacity = len(self.x)
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for name in ("x", "y", "length", "angle", "alpha"):
+            grown = np.zeros(capacity, dtype=np.float32)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
+
+    def respawn(self, index, width, height, intensity):
+        """Put the given lines at random places with a new length and brightness (they keep their angle)."""
+        n = len(index)
+        self.x[index] = np.random.randint(0, width + 1, n)
+        self.y[index] = np.random.randint(0, height + 1, n)
+        self.length[index] = np.random.randint(20, 101, n) * intensity
+        self.alpha[index] = np.random.uniform(0.3, 0.9, n)
+
+    def update(self, count, width, height, intensity, move_speed):
+        """Keep count lines alive and return their segments (x0, y0, x1, y1, alpha) for this frame.
+
+        Afterwards each line moves back along itself by move_speed times its
+        length, and lines that left the screen respawn.
+        """
+        if count > self.count:
+            self.reserve(count)
+            new = np.arange(self.count, count)
+            self.respawn(new, width, height, intensity)
+            self.angle[new] = np.random.uniform(-0.3, 0.3, len(new))
+        self.count = count
+
+        x, y = self.x[:count], self.y[:count]
+        dx = self.length[:count] * np.cos(self.angle[:count])
+        dy = self.length[:count] * np.sin(self.angle[:count])
+        segments = (x.copy(), y.copy(), x + dx, y + dy, self.alpha[:count].copy())
+
+        x -= dx * move_speed
+        y -= dy * move_speed
+        outside = np.flatnonzero((x < 0) | (x > width) | (y < 0) | (y > height))
+        if len(outside):
+            self.respawn(outside, width, height, intensity)
+        return segments
+
+def quad_triangles(corners_x, corners_y, rgb, alpha):
+    """Two triangles per quad from (N, 4) corner coordinates, as (6N, 6) rows of x, y, r, g, b, a."""
+    order = [0, 1, 2, 0, 2, 3]
+    vertices = np.empty((len(corners_x), 6, 6), dtype=np.float32)
+    vertices[:, :, 0] = corners_x[:, order]
+    vertices[:, :, 1] = corners_y[:, order]
+    vertices[:, :, 2:5] = rgb
+    vertices[:, :, 5] = np.asarray(alpha, dtype=np.float32).reshape(-1, 1)
+    return vertices.reshape(-1, 6)
+
+def line_triangles(x0, y0, x1, y1, rgb, alpha, thickness):
+    """Line segments as quads thickness pixels wide; see quad_triangles."""
+    dx, dy = x1 - x0, y1 - y0
+    scale = 0.5 * thickness / np.maximum(np.hypot(dx, dy), 1e-6)
+    nx, ny = -dy * scale, dx * scale
+    corners_x = np.stack([x0 + nx, x1 + nx, x1 - nx, x0 - nx], axis=1)
+    corners_y = np.stack([y0 + ny, y1 + ny, y1 - ny, y0 - ny], axis=1)
+    return quad_triangles(corners_x, corners_y, rgb, alpha)
+
+def ring_triangles(center_x, center_y, inner_radius, outer_radius, segments, rgb, alpha):
+    """A ring of quads whose alpha fades from alpha to zero around the circle; see quad_triangles."""
+    angles = 2 * np.pi * np.arange(segments + 1) / segments
+    cos_a, sin_a = np.cos(angles), np.sin(angles)
+    corners_x = center_x + np.stack([cos_a[:-1] * outer_radius, cos_a[1:] * outer_radius,
+                                     cos_a[1:] * inner_radius, cos_a[:-1] * inner_radius], axis=1)
+    corners_y = center_y + np.stack([sin_a[:-1] * outer_radius, sin_a[1:] * outer_radius,
+                                     sin_a[1:] * inner_radius, sin_a[:-1] * inner_radius], axis=1)
+    return quad_triangles(corners_x, corners_y, rgb, alpha * (1.0 - np.arange(segments) / segments))
@@ -0,0 +1,159 @@
+import ctypes
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+try:
+    from OpenGL.GL import *
+    from OpenGL.error import Error as GLError, NullFunctionError
+    HAVE_GL = True
+except ImportError:
+    # Headless runs only time the CPU
+    HAVE_GL = False
+
+class Profiler:
+    """Per-phase frame timer with rolling percentiles and Chrome-trace export.
+
+    CPU time is measured around every phase. When the profiler is created with
+    gpu=True, phases opened with gpu=True are also wrapped in GL_TIME_ELAPSED
+    queries, unless another GPU-timed phase is already open (those queries can't
+    nest). Query results are collected a few frames later, so reading them never
+    stalls the pipeline.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=240, trace_capacity=100000, gpu=False, trace=True):
+        self.enabled = True
+        # Keep per-call events for dump_chrome_trace (percentiles don't need them)
+        self.trace = trace
+        self.window = window
+        self.cpu_samples = {}
+        self.gpu_samples = {}
+        # Per-frame counts (e.g. objects drawn), kept over the same window as the timings
+        self.counter_samples = {}
+        self.trace_events = deque(maxlen=trace_capacity)
+        self.frame = 0
+        self.origin = time.perf_counter()
+
+        self.gpu = gpu
+        self.gpu_active = False
+        self.free_queries = []
+        self.pending_queries = deque()
+        if gpu:
+            self.gpu = self.timer_queries_supported()
+
+    @staticmethod
+    def timer_queries_supported():
+        if not HAVE_GL:
+            return False
+        try:
+            # PyOpenGL returns the generated ids as an array
+            query = int(glGenQueries(1)[0])
+            glDeleteQueries(1, [query])
+            return True
+        except (GLError, NullFunctionError):
+            return False
+
+    def samples(self, store, name):
+        if name not in store:
+            store[name] = deque(maxlen=self.window)
+        return store[name]
+
+    @contextmanager
+    def phase(self, name, gpu=False):
+        """Time the body of a with-block as one phase."""
+        if not self.enabled:
+            yield
+            return
+        query = self.begin_gpu_query(name) if gpu and self.gpu and not self.gpu_active else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if query is not None:
+                self.end_gpu_query()
+            self.samples(self.cpu_samples, name).append((end - start) * 1000.0)
+            if self.trace:
+                self.trace_events.append({
+                    "name": name, "cat": "cpu", "ph": "X", "pid": 0, "tid": 0,
+                    "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6,
+                    "args": {"frame": self.frame},
+                })
+
+    def count(self, name, value):
+        """Record this frame's value of a counter."""
+        if self.enabled:
+            self.samples(self.counter_samples, name).append(value)
+
+    def counters(self):
+        """Latest value and rolling mean of every counter, e.g. for JSON output."""
+        return {name: {"last": samples[-1], "mean": float(np.mean(samples))}
+                for name, samples in self.counter_samples.items() if samples}
+
+    def begin_gpu_query(self, name):
+        query = self.free_queries.pop() if self.free_queries else int(glGenQueries(1)[0])
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        self.gpu_active = True
+        self.pending_queries.append((name, query))
+        return query
+
+    def end_gpu_query(self):
+        glEndQuery(GL_TIME_ELAPSED)
+        self.gpu_active = False
+
+    def collect_gpu_queries(self):
+        # Results arrive in submission order, so stop at the first one still in flight
+        while self.pending_queries:
+            name, query = self.pending_queries[0]
+            if not glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE):
+                break
+            self.pending_queries.popleft()
+            # PyOpenGL can't allocate 64-bit query results itself, so read into a c_uint64
+            nanoseconds = ctypes.c_uint64()
+            glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(nanoseconds))
+            self.samples(self.gpu_samples, name).append(nanoseconds.value / 1e6)
+            self.free_queries.append(query)
+
+    def end_frame(self):
+        if self.gpu:
+            self.collect_gpu_queries()
+        self.frame += 1
+
+    def percentiles(self, name, gpu=False):
+        """Rolling (p50, p95, p99) of a phase in milliseconds, or None before any samples."""
+        samples = (self.gpu_samples if gpu else self.cpu_samples).get(name)
+        if not samples:
+            return None
+        return tuple(np.percentile(np.fromiter(samples, dtype=np.float64), self.PERCENTILES))
+
+    def report(self):
+        """Percentiles of every phase as a plain dict, e.g. for JSON output."""
+        report = {}
+        for kind, store in (("cpu", self.cpu_samples), ("gpu", self.gpu_samples)):
+            for name in store:
+                p50, p95, p99 = self.percentiles(name, gpu=(kind == "gpu"))
+                report.setdefault(name, {})[kind] = {"p50": p50, "p95": p95, "p99": p99}
+        return report
+
+    def reset(self):
+        self.cpu_samples.clear()
+        self.gpu_samples.clear()
+        self.counter_samples.clear()
+        self.trace_events.clear()
+
+    def dump_chrome_trace(self, path):
+        """Write the recorded phases in the Chrome trace format (chrome://tracing, Perfetto)."""
+        with open(path, "w") as file:
+            json.dump({"traceEvents": list(self.trace_events), "displayTimeUnit": "ms"}, file)
+        return path
+
+    def Delete(self):
+        if not self.gpu:
+            return
+        queries = self.free_queries + [query for _, query in self.pending_queries]
+        if queries:
+            glDeleteQueries(len(queries), queries)
+        self.free_queries = []
+        self.pending_queries.clear()
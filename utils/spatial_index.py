@@ -0,0 +1,123 @@
+import itertools
+import numpy as np
+
+def segment_sphere_hits(starts, ends, centres, radii):
+    """Test segments against spheres pairwise (all arrays row-aligned).
+
+    Returns a boolean hit mask and the parameter t in [0, 1] of the point on each
+    segment closest to its sphere centre, which orders hits along the segment.
+    """
+    direction = ends - starts
+    length_sq = np.einsum('ij,ij->i', direction, direction)
+    t = np.einsum('ij,ij->i', centres - starts, direction) / np.maximum(length_sq, 1e-12)
+    t = np.clip(t, 0.0, 1.0)
+    closest = starts + t[:, np.newaxis] * direction
+    distance_sq = np.einsum('ij,ij->i', closest - centres, closest - centres)
+    return distance_sq < radii * radii, t
+
+class SpatialGrid:
+    """Uniform hash grid over sphere targets for broad-phase point queries.
+
+    Targets are inserted into every cell their bounding box touches, so a point
+    only needs to look at the single cell it falls in. Cells are hashed from
+    integer coordinates, which keeps the grid unbounded (lasers leave the world).
+
+    Segment queries sample each segment every 2 * margin units. Growing the
+    target bounds by margin when inserting them makes that sampling
+    conservative, so no sphere touched by a segment is missed.
+    """
+    # Cell coordinates are offset into [0, 2**20) per axis before being packed
+    AXIS_BITS = 20
+    AXIS_OFFSET = 1 << (AXIS_BITS - 1)
+
+    def __init__(self, cell_size=250.0, margin=0.0):
+        self.cell_size = float(cell_size)
+        self.margin = float(margin)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.entries = np.zeros(0, dtype=np.intp)
+        self.positions = np.zeros((0, 3), dtype=np.float32)
+        self.radii = np.zeros(0, dtype=np.float32)
+
+    def cell_coords(self, points):
+        return np.floor(np.asarray(points, dtype=np.float64) / self.cell_size).astype(np.int64)
+
+    def cell_keys(self, coords):
+        coords = coords + self.AXIS_OFFSET
+        return (coords[..., 0] << (2 * self.AXIS_BITS)) | (coords[..., 1] << self.AXIS_BITS) | coords[..., 2]
+
+    def build(self, positions, radii):
+        """Rebuild the grid from target centres (N,3) and radii (N,)."""
+        self.positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), (len(self.positions),))
+        if len(self.positions) == 0:
+            self.keys = np.zeros(0, dtype=np.int64)
+            self.entries = np.zeros(0, dtype=np.intp)
+            return
+
+        extent = (self.radii + self.margin)[:, np.newaxis]
+        low = self.cell_coords(self.positions - extent)
+        high = self.cell_coords(self.positions + extent)
+        span = int((high - low).max()) + 1
+
+        keys = []
+        entries = []
+        targets = np.arange(len(self.positions))
+        for offset in itertools.product(range(span), repeat=3):
+            cells = low + np.array(offset, dtype=np.int64)
+            inside = np.all(cells <= high, axis=1)
+            keys.append(self.cell_keys(cells[inside]))
+            entries.append(targets[inside])
+
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.entries = np.concatenate(entries)[order]
+
+    def candidates(self, points):
+        """Return (point index, target index) pairs sharing a cell with each point."""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        keys = self.cell_keys(self.cell_coords(points))
+        start = np.searchsorted(self.keys, keys, side='left')
+        count = np.searchsorted(self.keys, keys, side='right') - start
+
+        total = int(count.sum())
+        point_index = np.repeat(np.arange(len(points)), count)
+        # Walk each point's contiguous run of sorted entries
+        run_start = np.repeat(start - (np.cumsum(count) - count), count)
+        target_index = self.entries[run_start + np.arange(total)]
+        return point_index, target_index
+
+    def query(self, points, point_radius=0.0):
+        """Return (point index, target index) pairs whose spheres actually overlap."""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        point_index, target_index = self.candidates(points)
+        distance = np.linalg.norm(points[point_index] - self.positions[target_index], axis=1)
+        hit = distance < self.radii[target_index] + point_radius
+        return point_index[hit], target_index[hit]
+
+    def query_segments(self, starts, ends):
+        """Return (segment index, target index, t) for every sphere each segment passes through."""
+        if self.margin <= 0.0:
+            raise ValueError("SpatialGrid needs a margin > 0 for segment queries")
+        if len(self.positions) == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+        starts = np.asarray(starts, dtype=np.float32).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float32).reshape(-1, 3)
+
+        # Sample every segment densely enough that each point on it is within margin of a sample
+        step = 2.0 * self.margin
+        lengths = np.linalg.norm(ends - starts, axis=1)
+        samples = np.ceil(lengths / step).astype(np.intp) + 1
+        segment = np.repeat(np.arange(len(starts)), samples)
+        first = np.repeat(np.cumsum(samples) - samples, samples)
+        fraction = (np.arange(len(segment)) - first) / np.maximum(np.repeat(samples, samples) - 1, 1)
+        points = starts[segment] + fraction[:, np.newaxis] * (ends - starts)[segment]
+
+        sample_index, target_index = self.candidates(points)
+        pair_keys = np.unique(segment[sample_index] * len(self.positions) + target_index)
+        segment_index, target_index = np.divmod(pair_keys, len(self.positions))
+
+        hit, t = segment_sphere_hits(starts[segment_index], ends[segment_index],
+                                     self.positions[target_index], self.radii[target_index])
+        return segment_index[hit], target_index[hit], t[hit]
@@ -4,7 +4,7 @@ import imgui
 from imgui.integrations.glfw import GlfwRenderer
 
 class Window:
-    def __init__(self):
+    def __init__(self, visible=True):
 
         # Initialize glfw
         glfw.init()
@@ -12,6 +12,8 @@ class Window:
         glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
         glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
         glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, GL_TRUE)
+        # Hidden windows still get a full GL context (offscreen benchmarks)
+        glfw.window_hint(glfw.VISIBLE, glfw.TRUE if visible else glfw.FALSE)
         
         # Get the primary monitor for fullscreen
         monitor = glfw.get_primary_monitor()
@@ -81,6 +83,7 @@ class Window:
             "ESCAPE":False,
             "2":False,
             "F":False,
+            "P":False,
             }
         
         if glfw.get_key(self.window, glfw.KEY_1) == glfw.PRESS:
@@ -111,6 +114,8 @@ class Window:
             inputs["ESCAPE"] = True
         if glfw.get_key(self.window, glfw.KEY_F) == glfw.PRESS:
             inputs["F"] = True
+        if glfw.get_key(self.window, glfw.KEY_P) == glfw.PRESS:
+            inputs["P"] = True
 
         xpos, ypos = glfw.get_cursor_pos(self.window)
         inputs["mouseDelta"] = [xpos - self.windowWidth/2, ypos - self.windowHeight/2]